@@ -8,6 +8,7 @@ safe for concurrent use in ThreadPoolExecutor.
 from __future__ import annotations
 
 import base64
+import functools
 import json
 import logging
 import re
@@ -40,8 +41,9 @@ _BLOCKED_PATTERNS = re.compile(
 )
 
 
+@functools.lru_cache(maxsize=4096)
 def _validate_input(value: str) -> bool:
-    """Safety check on a SymPy input value."""
+    """Safety check on a SymPy input value (pure, so results are cached)."""
     if not value or len(value) > 500:
         return False
     if _BLOCKED_PATTERNS.search(value):
@@ -154,6 +156,10 @@ _TEMPLATES: dict[str, dict[str, Any]] = {
     },
 }
 
+_TEMPLATE_DESCRIPTIONS: dict[str, str] = {
+    k: v["description"] for k, v in _TEMPLATES.items()
+}
+
 
 # ---------------------------------------------------------------------------
 # Engine
@@ -360,7 +366,7 @@ class SympyEngine(BaseEngine):
     @classmethod
     def available_templates(cls) -> dict[str, str]:
         """Return template name -> description mapping."""
-        return {k: v["description"] for k, v in _TEMPLATES.items()}
+        return dict(_TEMPLATE_DESCRIPTIONS)
 
 
 # ---------------------------------------------------------------------------
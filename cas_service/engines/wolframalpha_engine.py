@@ -42,6 +42,10 @@ _TEMPLATES: dict[str, dict[str, Any]] = {
     },
 }
 
+_TEMPLATE_DESCRIPTIONS: dict[str, str] = {
+    k: v["description"] for k, v in _TEMPLATES.items()
+}
+
 
 class WolframAlphaEngine(BaseEngine):
     """WolframAlpha remote compute engine — optional, needs CAS_WOLFRAMALPHA_APPID."""
@@ -245,4 +249,4 @@ class WolframAlphaEngine(BaseEngine):
     @classmethod
     def available_templates(cls) -> dict[str, str]:
         """Return template name -> description mapping."""
-        return {k: v["description"] for k, v in _TEMPLATES.items()}
+        return dict(_TEMPLATE_DESCRIPTIONS)
@@ -0,0 +1,52 @@
+"""Per-host cache of discovered engine binary paths (best effort)."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+from pathlib import Path
+
+# ~/.cache/cas-service/paths.json (honours XDG_CACHE_HOME)
+_CACHE_FILE = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "cas-service"
+    / "paths.json"
+)
+
+
+def _read_all() -> dict[str, dict[str, str]]:
+    try:
+        data = json.loads(_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load() -> dict[str, str]:
+    """Return cached paths for this host (empty if missing or unreadable)."""
+    entries = _read_all().get(socket.gethostname())
+    return dict(entries) if isinstance(entries, dict) else {}
+
+
+def save(key: str, path: str | None) -> None:
+    """Store a discovered path for this host; None removes the entry."""
+    data = _read_all()
+    host = socket.gethostname()
+    entries = data.get(host)
+    if not isinstance(entries, dict):
+        entries = {}
+    if path is None:
+        if key not in entries:
+            return
+        entries.pop(key)
+    elif entries.get(key) == path:
+        return
+    else:
+        entries[key] = path
+    data[host] = entries
+    try:
+        _CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _CACHE_FILE.write_text(json.dumps(data, indent=2) + "\n")
+    except OSError:
+        pass
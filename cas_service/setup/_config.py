@@ -36,11 +36,16 @@ def read_config() -> dict[str, str]:
 
 
 def write_key(key: str, value: str) -> None:
-    """Set a single key in the .env file (create if missing, update if exists)."""
+    """Set a single key in the .env file (create if missing, update if exists).
+
+    The file is left untouched when the key already holds this value.
+    """
     lines: list[str] = []
     found = False
+    existing: str | None = None
     if _ENV_FILE.exists():
-        for line in _ENV_FILE.read_text().splitlines():
+        existing = _ENV_FILE.read_text()
+        for line in existing.splitlines():
             if re.match(rf"^{re.escape(key)}=", line):
                 lines.append(f"{key}={value}")
                 found = True
@@ -48,7 +53,10 @@ def write_key(key: str, value: str) -> None:
                 lines.append(line)
     if not found:
         lines.append(f"{key}={value}")
-    _ENV_FILE.write_text("\n".join(lines) + "\n")
+    content = "\n".join(lines) + "\n"
+    if content == existing:
+        return
+    _ENV_FILE.write_text(content)
 
 
 def get_key(key: str) -> str | None:
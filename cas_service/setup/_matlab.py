@@ -8,11 +8,16 @@ import shutil
 
 from rich.console import Console
 
+from cas_service.setup import _cache
 from cas_service.setup._config import env_path, get_key, write_key
 
+# Standard Linux install root: one subdirectory per release (R2025a, R2024b, ...)
+_MATLAB_ROOT = "/usr/local/MATLAB"
+_MATLAB_ROOT_PATTERN = f"{_MATLAB_ROOT}/*/bin/matlab"
+
 # Common MATLAB binary locations across platforms
 _SEARCH_PATHS = [
-    "/usr/local/MATLAB/*/bin/matlab",
+    _MATLAB_ROOT_PATTERN,
     "/Applications/MATLAB_*.app/bin/matlab",
     "/opt/MATLAB/*/bin/matlab",
     os.path.expanduser("~/MATLAB/*/bin/matlab"),
@@ -25,6 +30,31 @@ _SEARCH_PATHS = [
     "/Volumes/*/MATLAB*/bin/matlab",
 ]
 
+try:
+    import questionary as _q
+except ImportError:  # prompt is skipped; auto-detection still works
+    _q = None
+
+# Release name -> release directory under _MATLAB_ROOT, built on first use
+_MATLAB_INDEX: dict[str, str] | None = None
+
+
+def _matlab_index() -> dict[str, str]:
+    """Return the cached index of releases installed under _MATLAB_ROOT."""
+    if _MATLAB_INDEX is None:
+        _refresh_matlab_index()
+    return _MATLAB_INDEX or {}
+
+
+def _refresh_matlab_index() -> None:
+    """Rebuild the release index with a single directory enumeration."""
+    global _MATLAB_INDEX
+    try:
+        with os.scandir(_MATLAB_ROOT) as entries:
+            _MATLAB_INDEX = {e.name: e.path for e in entries if e.is_dir()}
+    except OSError:
+        _MATLAB_INDEX = {}
+
 
 class MatlabStep:
     """Search for MATLAB binary. This engine is optional."""
@@ -37,16 +67,14 @@ class MatlabStep:
 
     def check(self) -> bool:
         """Return True if a MATLAB binary is configured or found."""
-        configured = get_key("CAS_MATLAB_PATH")
-        configured_path = self._resolve_executable(configured)
-        if configured_path:
-            self._found_path = configured_path
-            return True
-        self._found_path = self._find_matlab()
+        self._found_path = self._find_matlab(use_cache=True)
         return self._found_path is not None
 
     def install(self, console: Console) -> bool:
         """Report MATLAB status and prompt for custom path."""
+        # A release may have been installed since the index/cache was built
+        _refresh_matlab_index()
+        _cache.save("matlab", None)
         # Try auto-detection first
         path = self._find_matlab()
         if path:
@@ -65,25 +93,24 @@ class MatlabStep:
         console.print()
 
         # Let user provide a custom path
-        try:
-            import questionary
-
-            custom = questionary.text(
-                "Enter MATLAB binary path (or press Enter to skip):",
-                default="",
-            ).ask()
-            resolved = self._resolve_executable(custom)
-            if custom and resolved:
-                self._found_path = resolved
-                write_key("CAS_MATLAB_PATH", resolved)
-                console.print(f"  [green]Saved CAS_MATLAB_PATH={resolved}[/]")
-                return True
-            if custom:
-                console.print(
-                    f"  [yellow]Path not found or not executable: {custom}[/]"
-                )
-        except Exception:
-            pass
+        if _q is not None:
+            try:
+                custom = _q.text(
+                    "Enter MATLAB binary path (or press Enter to skip):",
+                    default="",
+                ).ask()
+                resolved = self._resolve_executable(custom)
+                if custom and resolved:
+                    self._found_path = resolved
+                    write_key("CAS_MATLAB_PATH", resolved)
+                    console.print(f"  [green]Saved CAS_MATLAB_PATH={resolved}[/]")
+                    return True
+                if custom:
+                    console.print(
+                        f"  [yellow]Path not found or not executable: {custom}[/]"
+                    )
+            except Exception:
+                pass
 
         console.print("  [yellow]MATLAB not found — skipping (this is fine).[/]")
         console.print(f"  To add later, set CAS_MATLAB_PATH in: [bold]{env_path()}[/]")
@@ -94,18 +121,43 @@ class MatlabStep:
         return self._resolve_executable(self._found_path) is not None
 
     @staticmethod
-    def _find_matlab() -> str | None:
-        """Search common paths for the MATLAB binary."""
+    def _find_matlab(*, use_cache: bool = False) -> str | None:
+        """Search common paths for the MATLAB binary.
+
+        Cheapest lookups first: configured CAS_MATLAB_PATH, then (with
+        use_cache) the path discovered on a previous run, then PATH, and
+        only then the filesystem search paths.
+        """
         # Check configured path first
         configured = MatlabStep._resolve_executable(get_key("CAS_MATLAB_PATH"))
         if configured:
             return configured
+        if use_cache:
+            cached = _cache.load().get("matlab")
+            if cached and os.path.isfile(cached) and os.access(cached, os.X_OK):
+                return cached
+        found = MatlabStep._search_matlab()
+        if found:
+            _cache.save("matlab", found)
+        return found
+
+    @staticmethod
+    def _search_matlab() -> str | None:
+        """Look for MATLAB on PATH, then in the common install locations."""
         # Check PATH (important when CAS_MATLAB_PATH is unset and binary is symlinked)
         in_path = shutil.which("matlab")
         if in_path:
             return in_path
         for pattern in _SEARCH_PATHS:
-            if "*" in pattern:
+            if pattern == _MATLAB_ROOT_PATTERN:
+                index = _matlab_index()
+                for release in sorted(index, reverse=True):
+                    resolved = MatlabStep._resolve_executable(
+                        os.path.join(index[release], "bin", "matlab")
+                    )
+                    if resolved:
+                        return resolved
+            elif "*" in pattern:
                 matches = sorted(glob.glob(pattern), reverse=True)
                 for match in matches:
                     resolved = MatlabStep._resolve_executable(match)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import inspect
 from typing import Protocol
 
 import questionary
@@ -18,13 +20,51 @@ class SetupStep(Protocol):
     def verify(self) -> bool: ...
 
 
-def _run_single_step(step: SetupStep, console: Console, *, force_run: bool = False) -> str:
-    """Execute a single step and return a status string."""
-    with console.status(f"[bold cyan]Checking {step.name}...[/]"):
-        already_ok = step.check()
+async def _acheck(step: SetupStep) -> bool:
+    """Run a step's check without blocking the loop.
+
+    Steps may define a native ``async def acheck()``; otherwise the sync
+    ``check()`` is offloaded to a worker thread.
+    """
+    acheck = getattr(step, "acheck", None)
+    if inspect.iscoroutinefunction(acheck):
+        return await acheck()
+    return await asyncio.to_thread(step.check)
+
+
+def _probe_checks(steps: list[SetupStep]) -> list[bool | None]:
+    """Run all step checks concurrently; None marks a check that raised."""
+
+    async def _gather() -> list[object]:
+        return await asyncio.gather(
+            *(_acheck(step) for step in steps), return_exceptions=True
+        )
+
+    return [
+        None if isinstance(result, BaseException) else bool(result)
+        for result in asyncio.run(_gather())
+    ]
+
+
+def _run_single_step(
+    step: SetupStep,
+    console: Console,
+    *,
+    force_run: bool = False,
+    checked: bool | None = None,
+) -> str:
+    """Execute a single step and return a status string.
+
+    ``checked`` is a check() result probed ahead of time; None runs it now.
+    """
+    if checked is None:
+        with console.status(f"[bold cyan]Checking {step.name}...[/]"):
+            already_ok = step.check()
+    else:
+        already_ok = checked
     if already_ok and not force_run:
-            console.print(f"  [green]ok[/] {step.name} — already configured")
-            return "ok"
+        console.print(f"  [green]ok[/] {step.name} — already configured")
+        return "ok"
     if already_ok and force_run:
         console.print(
             f"  [green]ok[/] {step.name} — already configured (re-running by user request)"
@@ -68,12 +108,19 @@ def _run_single_step(step: SetupStep, console: Console, *, force_run: bool = Fal
 
 def run_steps(steps: list[SetupStep], console: Console) -> bool:
     """Execute setup steps with interactive prompts on failure."""
+    with console.status("[bold cyan]Checking setup steps...[/]"):
+        prechecked = _probe_checks(steps)
     results: list[tuple[str, str]] = []
-    for step in steps:
-        status = _run_single_step(step, console)
+    stale = False
+    for step, checked in zip(steps, prechecked):
+        status = _run_single_step(step, console, checked=None if stale else checked)
         if status == "abort":
             return False
         results.append((step.name, status))
+        # Later steps often depend on earlier ones (Python -> SymPy), so once a
+        # step needed attention the remaining probes are re-run live.
+        if not checked:
+            stale = True
     console.print()
     _print_summary(results, console)
     return all(s != "failed" for _, s in results)
@@ -84,20 +131,19 @@ def run_interactive_menu(steps: list[SetupStep], console: Console) -> bool:
     session_statuses: list[str] = ["pending"] * len(steps)
     stale_indexes: set[int] = set(range(len(steps)))
 
-    def _checked_status(index: int, step: SetupStep) -> str:
-        try:
-            if step.check():
-                return "ok"
-        except Exception:
-            pass
+    def _checked_status(index: int, ok: bool | None) -> str:
+        if ok:
+            return "ok"
         current = session_statuses[index]
         if current in {"skipped", "failed", "warn"}:
             return current
         return "pending"
 
     def _refresh_indexes(indexes: set[int]) -> None:
-        for index in sorted(indexes):
-            session_statuses[index] = _checked_status(index, steps[index])
+        ordered = sorted(indexes)
+        probed = _probe_checks([steps[index] for index in ordered])
+        for index, ok in zip(ordered, probed):
+            session_statuses[index] = _checked_status(index, ok)
             stale_indexes.discard(index)
 
     def _snapshot() -> list[str]:
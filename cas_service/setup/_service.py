@@ -5,8 +5,10 @@ from __future__ import annotations
 import getpass
 import json
 import os
+import shlex
 import shutil
 import socket
+import stat
 import subprocess
 import tempfile
 import time
@@ -55,6 +57,14 @@ def _render_systemd_unit(template: str) -> str:
     return rendered
 
 
+def _stat_once(path: str) -> bool:
+    """Return whether path is a regular file, using a single stat call."""
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+
 class ServiceStep:
     """Configure CAS service deployment: systemd, Docker Compose, or foreground."""
 
@@ -218,7 +228,7 @@ class ServiceStep:
     # ------------------------------------------------------------------
 
     def _install_systemd(self, console: Console) -> bool:
-        """Copy unit file, daemon-reload, enable the service."""
+        """Install unit file, daemon-reload, enable and start the service."""
         if not os.path.isfile(UNIT_FILE_SRC):
             console.print(f"  [red]Unit file not found: {UNIT_FILE_SRC}[/]")
             return False
@@ -244,37 +254,24 @@ class ServiceStep:
             finally:
                 tmp.close()
 
-            console.print(f"  Copying rendered unit -> {UNIT_FILE_DST}")
-            subprocess.run(
-                ["sudo", "cp", tmp.name, UNIT_FILE_DST],
-                check=True,
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-            console.print("  Running daemon-reload...")
-            subprocess.run(
-                ["sudo", "systemctl", "daemon-reload"],
-                check=True,
-                capture_output=True,
-                text=True,
-                timeout=10,
+            console.print(
+                f"  Installing {UNIT_FILE_DST}, reloading systemd, "
+                "enabling and starting cas-service..."
             )
-            console.print("  Enabling cas-service...")
-            subprocess.run(
-                ["sudo", "systemctl", "enable", "cas-service"],
-                check=True,
-                capture_output=True,
-                text=True,
-                timeout=10,
+            # One sudo call: a single password prompt and PAM/audit pass.
+            script = " && ".join(
+                [
+                    f"install -m 644 {shlex.quote(tmp.name)} {shlex.quote(UNIT_FILE_DST)}",
+                    "systemctl daemon-reload",
+                    "systemctl enable --now cas-service",
+                ]
             )
-            console.print("  Starting cas-service...")
             subprocess.run(
-                ["sudo", "systemctl", "start", "cas-service"],
+                ["sudo", "bash", "-c", script],
                 check=True,
                 capture_output=True,
                 text=True,
-                timeout=10,
+                timeout=30,
             )
             console.print("  [green]systemd service installed and started.[/]")
             return True
@@ -454,12 +451,12 @@ class ServiceStep:
         resolved = (
             shutil.which(matlab_path) if not os.path.isabs(matlab_path) else matlab_path
         )
-        if not resolved or not os.path.isfile(resolved):
+        if not resolved or not _stat_once(resolved):
             return
 
+        # The binary is an existing file, so its resolved grandparent is an
+        # existing directory — no second stat needed.
         matlab_root = str(Path(resolved).resolve().parent.parent)
-        if not os.path.isdir(matlab_root):
-            return
 
         container_matlab_bin = f"{_DOCKER_MATLAB_MOUNT}/bin/matlab"
         if (
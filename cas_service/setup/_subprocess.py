@@ -0,0 +1,37 @@
+"""Async subprocess helper used by setup steps that probe concurrently."""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+
+
+async def run_async(
+    cmd: list[str],
+    *,
+    timeout: float,
+    cwd: str | None = None,
+) -> subprocess.CompletedProcess:
+    """Run a command without blocking the event loop, capturing text output.
+
+    Mirrors ``subprocess.run(..., capture_output=True, text=True)``; raises
+    ``subprocess.TimeoutExpired`` (after killing the child) on timeout.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout) from None
+    return subprocess.CompletedProcess(
+        args=cmd,
+        returncode=proc.returncode,
+        stdout=stdout.decode(errors="replace"),
+        stderr=stderr.decode(errors="replace"),
+    )
@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import re
 import subprocess
 from pathlib import Path
 
 from rich.console import Console
 
+from cas_service.setup._subprocess import run_async
+
 PROJECT_ROOT = str(Path(__file__).resolve().parent.parent.parent)
-MIN_VERSION = (1, 12)
+MIN_VERSION = (1, 12, 0)
+_VERSION_RE = re.compile(r"(\d+)\.(\d+)(?:\.(\d+))?")
+_VERSION_CMD = ["uv", "run", "python", "-c", "import sympy; print(sympy.__version__)"]
 
 
 class SympyStep:
@@ -21,6 +26,14 @@ class SympyStep:
         """Return True if SymPy can be imported with sufficient version."""
         return self._check_version()
 
+    async def acheck(self) -> bool:
+        """Async variant of check() so the runner can probe steps concurrently."""
+        try:
+            result = await run_async(_VERSION_CMD, timeout=15, cwd=PROJECT_ROOT)
+        except Exception:
+            return False
+        return self._version_ok(result)
+
     def install(self, console: Console) -> bool:
         """Run uv sync to ensure SymPy is installed in the venv."""
         console.print("  Running [bold]uv sync[/] to install SymPy...")
@@ -50,25 +63,22 @@ class SympyStep:
         """Check SymPy version via the project venv."""
         try:
             result = subprocess.run(
-                [
-                    "uv",
-                    "run",
-                    "python",
-                    "-c",
-                    "import sympy; print(sympy.__version__)",
-                ],
+                _VERSION_CMD,
                 capture_output=True,
                 text=True,
                 timeout=15,
                 cwd=PROJECT_ROOT,
             )
-            if result.returncode != 0:
-                return False
-            version_str = result.stdout.strip()
-            parts = version_str.split(".")
-            if len(parts) >= 2:
-                major, minor = int(parts[0]), int(parts[1])
-                return (major, minor) >= MIN_VERSION
-            return False
+            return SympyStep._version_ok(result)
         except Exception:
             return False
+
+    @staticmethod
+    def _version_ok(result: subprocess.CompletedProcess) -> bool:
+        """Return True if the version probe succeeded with a recent enough SymPy."""
+        if result.returncode != 0:
+            return False
+        match = _VERSION_RE.search(result.stdout)
+        if not match:
+            return False
+        return tuple(int(part or 0) for part in match.groups()) >= MIN_VERSION
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
-
 from rich.console import Console
 
 from cas_service.setup._config import env_path, get_key, write_key
 
+try:
+    import questionary
+except ImportError:  # prompt is skipped; the engine is optional anyway
+    questionary = None
+
 
 class WolframAlphaStep:
     """Configure WolframAlpha API key — optional engine."""
@@ -30,19 +34,20 @@ class WolframAlphaStep:
                 "  [dim]Enter a new key to replace, or press Enter to keep.[/]"
             )
 
-        try:
-            import questionary
-
-            new_key = questionary.password("WolframAlpha AppID (Enter to skip):").ask()
-            if new_key and new_key.strip():
-                write_key("CAS_WOLFRAMALPHA_APPID", new_key.strip())
-                console.print("  [green]Saved CAS_WOLFRAMALPHA_APPID to .env[/]")
-                return True
-            if existing:
-                console.print("  Keeping existing key.")
-                return True
-        except Exception:
-            pass
+        if questionary is not None:
+            try:
+                new_key = questionary.password(
+                    "WolframAlpha AppID (Enter to skip):"
+                ).ask()
+                if new_key and new_key.strip():
+                    write_key("CAS_WOLFRAMALPHA_APPID", new_key.strip())
+                    console.print("  [green]Saved CAS_WOLFRAMALPHA_APPID to .env[/]")
+                    return True
+                if existing:
+                    console.print("  Keeping existing key.")
+                    return True
+            except Exception:
+                pass
 
         console.print(
             "  WolframAlpha is [bold]optional[/] — the service works without it."
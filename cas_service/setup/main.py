@@ -182,9 +182,10 @@ def _handle_set(args: list[str], console: Console) -> int:
     return 0
 
 
-def main(args: list[str] | None = None) -> int:
-    """CLI entry point for the setup wizard."""
-    console = Console()
+def main(args: list[str] | None = None, console: Console | None = None) -> int:
+    """CLI entry point for the setup wizard; returns the process exit code."""
+    if console is None:
+        console = Console()
     console.print(BANNER, style="bold cyan")
 
     argv = args if args is not None else sys.argv[1:]
@@ -211,7 +212,7 @@ def main(args: list[str] | None = None) -> int:
                 f"[red]Unknown subcommand: {subcmd}[/]  "
                 f"(available: {', '.join(SUBCOMMANDS)})"
             )
-            sys.exit(1)
+            return 1
         factory, description = SUBCOMMANDS[subcmd]
         if subcmd == "set":
             console.print("[red]Usage:[/] cas-setup set <KEY> <VALUE>")
@@ -234,7 +235,7 @@ def main(args: list[str] | None = None) -> int:
         steps = _all_steps()
         success = run_interactive_menu(steps, console)
     if not success:
-        sys.exit(1)
+        return 1
     console.print("[bold green]Setup complete.[/]")
     return 0
 
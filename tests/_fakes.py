@@ -0,0 +1,31 @@
+"""Lightweight test doubles shared across test modules."""
+
+from __future__ import annotations
+
+from cas_service.runtime.executor import ExecResult
+
+
+class FakeExecutor:
+    """Executor stand-in whose run() always returns *result*."""
+
+    def __init__(self, result: ExecResult) -> None:
+        self._result = result
+
+    def run(self, *args: object, **kwargs: object) -> ExecResult:
+        return self._result
+
+
+class FakeUrlResponse:
+    """Minimal urlopen() response: a context manager whose read() returns *body*."""
+
+    def __init__(self, body: bytes) -> None:
+        self._body = body
+
+    def __enter__(self) -> FakeUrlResponse:
+        return self
+
+    def __exit__(self, *exc: object) -> bool:
+        return False
+
+    def read(self) -> bytes:
+        return self._body
@@ -0,0 +1,151 @@
+"""Shared test configuration."""
+
+from __future__ import annotations
+
+import io
+import json
+import select
+import subprocess
+import sys
+import time
+
+import pytest
+from rich.console import Console
+
+# Import the setup wizard once at conftest load so each test module's own
+# imports are sys.modules hits rather than first-time loads.
+import cas_service.setup._runner  # noqa: F401
+import cas_service.setup._service  # noqa: F401
+import cas_service.setup._verify  # noqa: F401
+import cas_service.setup._wolframalpha  # noqa: F401
+import cas_service.setup.main  # noqa: F401
+from cas_service.engines.sympy_engine import SympyEngine
+from cas_service.runtime.executor import ExecResult
+
+# ---------------------------------------------------------------------------
+# Console
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="session")
+def console() -> Console:
+    """Shared no-output Console for testing (avoids terminal pollution)."""
+    # Fixed width and no color system skip terminal probing. Markup stays
+    # enabled so malformed [tags] in step output still fail the tests.
+    return Console(
+        file=io.StringIO(),
+        highlight=False,
+        force_terminal=False,
+        color_system=None,
+        width=80,
+        legacy_windows=False,
+        emoji=False,
+        log_time=False,
+        log_path=False,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Warm SymPy worker
+# ---------------------------------------------------------------------------
+
+# Imports SymPy once, then runs each `python -c` script it is sent with the
+# request's stdin, answering with one JSON line per request.
+_SYMPY_WORKER = """\
+import io, json, sys, traceback
+import sympy, sympy.parsing.latex
+real_in, real_out = sys.stdin, sys.stdout
+for line in real_in:
+    req = json.loads(line)
+    sys.stdin, sys.stdout, sys.stderr = (
+        io.StringIO(req['stdin']), io.StringIO(), io.StringIO()
+    )
+    code = 0
+    try:
+        exec(req['script'], {'__name__': '__main__'})
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    out, err = sys.stdout.getvalue(), sys.stderr.getvalue()
+    sys.stdin, sys.stdout, sys.stderr = real_in, real_out, sys.__stderr__
+    real_out.write(json.dumps({'rc': code, 'out': out, 'err': err}) + '\\n')
+    real_out.flush()
+"""
+
+
+class PooledExecutor:
+    """Drop-in for SubprocessExecutor.run() backed by one warm SymPy worker.
+
+    Only handles ``[sys.executable, "-c", script]`` commands. A timed-out
+    worker is killed and respawned on the next call.
+    """
+
+    def __init__(self) -> None:
+        self._proc: subprocess.Popen[str] | None = None
+
+    def _worker(self) -> subprocess.Popen[str]:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                [sys.executable, "-c", _SYMPY_WORKER],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+        return self._proc
+
+    def run(
+        self,
+        command: list[str],
+        input_data: str | None = None,
+        timeout_s: int | None = None,
+        max_output: int | None = None,
+    ) -> ExecResult:
+        assert command[:2] == [sys.executable, "-c"], command
+        start = time.time()
+        proc = self._worker()
+        request = {"script": command[2], "stdin": input_data or ""}
+        proc.stdin.write(json.dumps(request) + "\n")
+        proc.stdin.flush()
+        ready, _, _ = select.select([proc.stdout], [], [], timeout_s or 30)
+        line = proc.stdout.readline() if ready else ""
+        elapsed = int((time.time() - start) * 1000)
+        if not line:
+            self.close()
+            return ExecResult(
+                returncode=-1,
+                stdout="",
+                stderr=f"Process timed out after {timeout_s}s",
+                time_ms=elapsed,
+                timed_out=True,
+            )
+        reply = json.loads(line)
+        return ExecResult(
+            returncode=reply["rc"],
+            stdout=reply["out"],
+            stderr=reply["err"],
+            time_ms=elapsed,
+        )
+
+    def close(self) -> None:
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+
+
+@pytest.fixture(scope="session")
+def sympy_engine_session():
+    """SympyEngine whose scripts run in one warm worker (SymPy imported once)."""
+    executor = PooledExecutor()
+    engine = SympyEngine(timeout=30)
+    engine._executor = executor
+    yield engine
+    executor.close()
+
+
+@pytest.fixture(scope="session")
+def sympy_version():
+    """SympyEngine().get_version(), looked up once per session."""
+    return SympyEngine().get_version()
@@ -6,7 +6,7 @@ import json
 import shutil
 from http.server import HTTPServer
 from threading import Thread
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -17,6 +17,7 @@ from cas_service.engines.sage_engine import (
     _validate_input,
 )
 from cas_service.runtime.executor import ExecResult
+from tests._fakes import FakeExecutor
 
 
 # ---------------------------------------------------------------------------
@@ -227,8 +228,7 @@ class TestSageEngineExecution:
             stderr="",
             time_ms=100,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         result = engine.validate("x^2 + 1")
         assert result.success is True
@@ -244,8 +244,7 @@ class TestSageEngineExecution:
             stderr="",
             time_ms=50,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         result = engine.validate("\\invalid{}")
         assert result.success is False  # error in parsing
@@ -260,8 +259,7 @@ class TestSageEngineExecution:
             time_ms=30000,
             timed_out=True,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         result = engine.validate("x^2")
         assert result.success is False
@@ -276,8 +274,7 @@ class TestSageEngineExecution:
             stderr="",
             time_ms=200,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         req = ComputeRequest(
             engine="sage",
@@ -298,8 +295,7 @@ class TestSageEngineExecution:
             stderr="Sage crashed",
             time_ms=100,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         req = ComputeRequest(
             engine="sage",
@@ -485,8 +481,7 @@ class TestSageGroupTheoryMocked:
             stderr="",
             time_ms=200,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         req = ComputeRequest(
             engine="sage",
@@ -507,8 +502,7 @@ class TestSageGroupTheoryMocked:
             stderr="",
             time_ms=200,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         req = ComputeRequest(
             engine="sage",
@@ -529,8 +523,7 @@ class TestSageGroupTheoryMocked:
             stderr="",
             time_ms=200,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         req = ComputeRequest(
             engine="sage",
@@ -50,6 +50,17 @@ class TestSetupConfig:
             "CAS_LOG_LEVEL=INFO",
         ]
 
+    def test_write_key_skips_write_when_unchanged(self, temp_env_file, monkeypatch):
+        temp_env_file.write_text("CAS_PORT=9000\nCAS_LOG_LEVEL=INFO\n")
+        writes: list[str] = []
+        monkeypatch.setattr(
+            type(temp_env_file), "write_text", lambda self, data: writes.append(data)
+        )
+
+        setup_config.write_key("CAS_PORT", "9000")
+
+        assert writes == []
+
     def test_get_key_falls_back_to_os_environ(self, temp_env_file, monkeypatch):
         monkeypatch.setenv("CAS_PORT", "7777")
         assert setup_config.get_key("CAS_PORT") == "7777"
@@ -5,12 +5,7 @@ from __future__ import annotations
 import subprocess
 from unittest.mock import MagicMock, patch
 
-import pytest
-from rich.console import Console
-
-
-def _console() -> Console:
-    return Console(file=MagicMock(), highlight=False)
+from cas_service.setup._sage import SageStep
 
 
 def _completed(
@@ -23,8 +18,6 @@ def _completed(
 
 class TestSageStep:
     def _make(self):
-        from cas_service.setup._sage import SageStep
-
         return SageStep()
 
     # -- check ---------------------------------------------------------------
@@ -57,53 +50,55 @@ class TestSageStep:
     @patch("cas_service.setup._sage.write_key")
     @patch("cas_service.setup._sage.SageStep._find_sage", return_value="/usr/local/bin/sage")
     @patch("cas_service.setup._sage.SageStep._get_version", return_value="SageMath 10.4")
-    def test_install_detected(self, mock_version, mock_find, mock_write_key):
+    def test_install_detected(self, mock_version, mock_find, mock_write_key, console):
         """install() saves path if Sage is auto-detected."""
         step = self._make()
-        assert step.install(_console()) is True
+        assert step.install(console) is True
         assert step._found_path == "/usr/local/bin/sage"
         mock_write_key.assert_called_once_with("CAS_SAGE_PATH", "/usr/local/bin/sage")
 
     @patch("cas_service.setup._sage.subprocess.run")
     @patch("cas_service.setup._sage.shutil.which")
     @patch("cas_service.setup._sage.SageStep._find_sage", return_value=None)
-    def test_install_apt_success(self, mock_find, mock_which, mock_run):
+    def test_install_apt_success(self, mock_find, mock_which, mock_run, console):
         """install() attempts apt install on Linux if sage missing."""
         mock_which.side_effect = lambda x: "/usr/bin/apt-get" if x == "apt-get" else ("/usr/bin/sage" if x == "sage" else None)
         mock_run.return_value = _completed(0)
         
         step = self._make()
-        assert step.install(_console()) is True
+        assert step.install(console) is True
         assert step._found_path == "/usr/bin/sage"
 
     @patch("cas_service.setup._sage.subprocess.run")
     @patch("cas_service.setup._sage.shutil.which")
     @patch("cas_service.setup._sage.SageStep._find_sage", return_value=None)
-    def test_install_port_success(self, mock_find, mock_which, mock_run):
+    def test_install_port_success(self, mock_find, mock_which, mock_run, console):
         """install() attempts MacPorts install on macOS when available."""
         mock_which.side_effect = lambda x: "/opt/local/bin/port" if x == "port" else (None if x in {"apt-get", "brew"} else ("/opt/local/bin/sage" if x == "sage" else None))
         mock_run.return_value = _completed(0)
 
         step = self._make()
-        assert step.install(_console()) is True
+        assert step.install(console) is True
         assert step._found_path == "/opt/local/bin/sage"
 
     @patch("cas_service.setup._sage.subprocess.run")
     @patch("cas_service.setup._sage.shutil.which")
     @patch("cas_service.setup._sage.SageStep._find_sage", return_value=None)
-    def test_install_brew_success(self, mock_find, mock_which, mock_run):
+    def test_install_brew_success(self, mock_find, mock_which, mock_run, console):
         """install() attempts brew install on macOS if sage missing."""
         mock_which.side_effect = lambda x: "/usr/local/bin/brew" if x == "brew" else (None if x in {"apt-get", "port"} else ("/usr/local/bin/sage" if x == "sage" else None))
         mock_run.return_value = _completed(0)
         
         step = self._make()
-        assert step.install(_console()) is True
+        assert step.install(console) is True
         assert step._found_path == "/usr/local/bin/sage"
 
     @patch("cas_service.setup._sage.subprocess.run", side_effect=Exception("apt crash"))
     @patch("cas_service.setup._sage.shutil.which")
     @patch("cas_service.setup._sage.SageStep._find_sage", return_value=None)
-    def test_install_apt_fails_and_prompt(self, mock_find, mock_which, mock_run):
+    def test_install_apt_fails_and_prompt(
+        self, mock_find, mock_which, mock_run, console
+    ):
         """install() prompts for path if auto-install fails."""
         mock_which.side_effect = lambda x: "/usr/bin/apt-get" if x == "apt-get" else None
         
@@ -113,19 +108,19 @@ class TestSageStep:
         step = self._make()
         with patch.dict("sys.modules", {"questionary": mock_q}):
             with patch("cas_service.setup._sage.shutil.which", return_value="/manual/sage"):
-                assert step.install(_console()) is True
+                assert step.install(console) is True
                 assert step._found_path == "/manual/sage"
 
     @patch("cas_service.setup._sage.shutil.which", return_value=None)
     @patch("cas_service.setup._sage.SageStep._find_sage", return_value=None)
-    def test_install_skip_prompt(self, mock_find, mock_which):
+    def test_install_skip_prompt(self, mock_find, mock_which, console):
         """install() returns False if user skips manual prompt."""
         mock_q = MagicMock()
         mock_q.text.return_value.ask.return_value = ""
         
         step = self._make()
         with patch.dict("sys.modules", {"questionary": mock_q}):
-            assert step.install(_console()) is False
+            assert step.install(console) is False
 
     # -- verify --------------------------------------------------------------
 
@@ -162,7 +157,9 @@ class TestSageStep:
     @patch("cas_service.setup._sage.glob.glob")
     @patch("cas_service.setup._sage.shutil.which", return_value=None)
     @patch("cas_service.setup._sage.get_key", return_value=None)
-    def test_find_sage_glob(self, mock_get_key, mock_which, mock_glob, mock_access, mock_isfile):
+    def test_find_sage_glob(
+        self, mock_get_key, mock_which, mock_glob, mock_access, mock_isfile
+    ):
         mock_glob.side_effect = lambda p: [p.replace("*", "9.5")] if "*" in p else []
         step = self._make()
         # It should eventually hit one of the patterns in _SEARCH_PATHS
@@ -4,13 +4,9 @@ from __future__ import annotations
 
 import subprocess
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
-from rich.console import Console
-
-
-def _console() -> Console:
-    return Console(file=MagicMock(), highlight=False)
+from cas_service.setup._service import PROJECT_ROOT, ServiceStep, _render_systemd_unit
 
 
 def _completed(
@@ -23,8 +19,6 @@ def _completed(
 
 class TestServiceStepExtra:
     def _make(self):
-        from cas_service.setup._service import ServiceStep
-
         return ServiceStep()
 
     # -- Docker Install ------------------------------------------------------
@@ -34,7 +28,7 @@ class TestServiceStepExtra:
     @patch("cas_service.setup._service.os.path.isfile", return_value=True)
     @patch("cas_service.setup._service.get_docker_port", return_value=9011)
     def test_install_docker_success(
-        self, mock_port, mock_isfile, mock_run, mock_which
+        self, mock_port, mock_isfile, mock_run, mock_which, console
     ):
         """_install_docker builds and runs container with aligned Docker env."""
         mock_which.side_effect = lambda x: f"/usr/bin/{x}"
@@ -44,7 +38,7 @@ class TestServiceStepExtra:
         with patch("cas_service.setup._service.ServiceStep._maybe_enable_matlab_volume"), patch(
             "cas_service.setup._service.ServiceStep._wait_health", return_value=True
         ):
-            assert step._install_docker(_console()) is True
+            assert step._install_docker(console) is True
 
         assert mock_run.call_count == 2
         args0 = mock_run.call_args_list[0][0][0]
@@ -60,7 +54,7 @@ class TestServiceStepExtra:
     @patch("cas_service.setup._service.os.path.isfile", return_value=True)
     @patch("cas_service.setup._service.get_docker_port", return_value=8769)
     def test_install_docker_no_dotenvx(
-        self, mock_port, mock_isfile, mock_run, mock_which
+        self, mock_port, mock_isfile, mock_run, mock_which, console
     ):
         """_install_docker works without dotenvx."""
         mock_which.side_effect = lambda x: "/usr/bin/docker" if x == "docker" else None
@@ -70,7 +64,7 @@ class TestServiceStepExtra:
         with patch("cas_service.setup._service.ServiceStep._maybe_enable_matlab_volume"), patch(
             "cas_service.setup._service.ServiceStep._wait_health", return_value=True
         ):
-            assert step._install_docker(_console()) is True
+            assert step._install_docker(console) is True
 
         args1 = mock_run.call_args_list[1][0][0]
         assert args1[0] == "docker"
@@ -80,28 +74,28 @@ class TestServiceStepExtra:
 
     @patch("cas_service.setup._service.subprocess.run")
     @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    def test_install_docker_build_fails(self, mock_isfile, mock_run):
+    def test_install_docker_build_fails(self, mock_isfile, mock_run, console):
         """_install_docker returns False if build fails."""
         mock_run.side_effect = subprocess.CalledProcessError(1, "docker")
 
         step = self._make()
         with patch("cas_service.setup._service.ServiceStep._maybe_enable_matlab_volume"):
-            assert step._install_docker(_console()) is False
+            assert step._install_docker(console) is False
 
     @patch("cas_service.setup._service.subprocess.run")
     @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    def test_install_docker_up_fails(self, mock_isfile, mock_run):
+    def test_install_docker_up_fails(self, mock_isfile, mock_run, console):
         """_install_docker returns False if up fails."""
-        mock_run.side_effect = [
+        mock_run.side_effect = (
             _completed(0),
             subprocess.CalledProcessError(1, "docker"),
-        ]
+        )
 
         step = self._make()
         with patch("cas_service.setup._service.ServiceStep._maybe_enable_matlab_volume"), patch(
             "cas_service.setup._service.ServiceStep._wait_health", return_value=True
         ):
-            assert step._install_docker(_console()) is False
+            assert step._install_docker(console) is False
 
     # -- Systemd edge cases --------------------------------------------------
 
@@ -111,24 +105,25 @@ class TestServiceStepExtra:
     )
     @patch("cas_service.setup._service.shutil.which", return_value="/usr/bin/systemctl")
     @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    def test_install_systemd_exception(self, mock_isfile, mock_which, mock_run):
+    def test_install_systemd_exception(
+        self, mock_isfile, mock_which, mock_run, console
+    ):
         """_install_systemd handles unexpected exceptions."""
         step = self._make()
-        assert step._install_systemd(_console()) is False
+        assert step._install_systemd(console) is False
 
     # -- MATLAB volume extra logic -------------------------------------------
 
     @patch("cas_service.setup._service.questionary")
     @patch("cas_service.setup._service.write_key")
-    @patch("cas_service.setup._service.os.path.isdir", return_value=True)
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
+    @patch("cas_service.setup._service._stat_once", return_value=True)
     @patch(
         "cas_service.setup._service.shutil.which",
         side_effect=lambda x: "/tmp/matlab/bin/matlab" if x == "matlab" else x,
     )
     @patch("cas_service.setup._service.get_key")
     def test_maybe_enable_matlab_volume_relative_path_writes_docker_env(
-        self, mock_get_key, mock_which, mock_isfile, mock_isdir, mock_write_key, mock_q
+        self, mock_get_key, mock_which, mock_stat, mock_write_key, mock_q, console
     ):
         """_maybe_enable_matlab_volume resolves relative host MATLAB and writes Docker env keys."""
         mock_q.confirm.return_value.ask.return_value = True
@@ -140,11 +135,9 @@ class TestServiceStepExtra:
         }
         mock_get_key.side_effect = values.get
 
-        from cas_service.setup._service import ServiceStep
-
         with patch("cas_service.setup._service.Path.resolve") as mock_resolve:
             mock_resolve.return_value = Path("/tmp/matlab/bin/matlab")
-            ServiceStep._maybe_enable_matlab_volume(_console())
+            ServiceStep._maybe_enable_matlab_volume(console)
 
         mock_write_key.assert_any_call("CAS_DOCKER_MATLAB_HOST_PATH", "/tmp/matlab")
         mock_write_key.assert_any_call(
@@ -153,11 +146,10 @@ class TestServiceStepExtra:
 
     @patch("cas_service.setup._service.questionary")
     @patch("cas_service.setup._service.write_key")
-    @patch("cas_service.setup._service.os.path.isdir", return_value=True)
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
+    @patch("cas_service.setup._service._stat_once", return_value=True)
     @patch("cas_service.setup._service.get_key")
     def test_maybe_enable_matlab_volume_already_present_in_env(
-        self, mock_get_key, mock_isfile, mock_isdir, mock_write_key, mock_q
+        self, mock_get_key, mock_stat, mock_write_key, mock_q, console
     ):
         """_maybe_enable_matlab_volume does not rewrite when Docker env is already aligned."""
         values = {
@@ -167,11 +159,9 @@ class TestServiceStepExtra:
         }
         mock_get_key.side_effect = values.get
 
-        from cas_service.setup._service import ServiceStep
-
         with patch("cas_service.setup._service.Path.resolve") as mock_resolve:
             mock_resolve.return_value = Path("/opt/matlab/bin/matlab")
-            ServiceStep._maybe_enable_matlab_volume(_console())
+            ServiceStep._maybe_enable_matlab_volume(console)
 
         mock_q.confirm.assert_not_called()
         mock_write_key.assert_not_called()
@@ -194,8 +184,6 @@ class TestServiceStepExtra:
 
 class TestSystemdTemplateRendering:
     def test_render_systemd_unit_replaces_placeholders(self):
-        from cas_service.setup._service import PROJECT_ROOT, _render_systemd_unit
-
         template = (
             "User=your-username\n"
             "WorkingDirectory=/path/to/cas-service\n"
@@ -210,3 +198,9 @@ class TestSystemdTemplateRendering:
             f"ExecStart={PROJECT_ROOT}/.venv/bin/python -m cas_service.main"
             in rendered
         )
+
+    def test_render_systemd_unit_handles_crlf_line_endings(self):
+        rendered = _render_systemd_unit(
+            "[Service]\r\nWorkingDirectory=/path/to/cas-service\r\n"
+        )
+        assert f"WorkingDirectory={PROJECT_ROOT}\r\n" in rendered
@@ -0,0 +1,31 @@
+"""Tests for the async subprocess helper used by setup step probes."""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from cas_service.setup._subprocess import run_async
+
+
+def test_run_async_captures_output():
+    result = asyncio.run(
+        run_async(
+            [sys.executable, "-c", "import sys; print('out'); sys.exit(3)"],
+            timeout=10,
+        )
+    )
+    assert result.returncode == 3
+    assert result.stdout == "out\n"
+    assert result.stderr == ""
+
+
+def test_run_async_kills_on_timeout():
+    cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+    with pytest.raises(subprocess.TimeoutExpired) as excinfo:
+        asyncio.run(run_async(cmd, timeout=0.2))
+    assert excinfo.value.cmd == cmd
+    assert excinfo.value.timeout == 0.2
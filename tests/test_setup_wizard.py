@@ -2,13 +2,33 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import subprocess
+import sys
+from contextlib import ExitStack
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
-from rich.console import Console
+
+from cas_service.setup import _cache, _matlab
+from cas_service.setup._matlab import MatlabStep
+from cas_service.setup._python import PythonStep
+from cas_service.setup._runner import (
+    SetupStep,
+    _print_summary,
+    _probe_checks,
+    run_interactive_menu,
+    run_steps,
+)
+from cas_service.setup._sage import SageStep
+from cas_service.setup._service import ServiceStep, _stat_once
+from cas_service.setup._sympy import SympyStep
+from cas_service.setup._verify import VerifyStep
+from cas_service.setup.main import main
+from tests._fakes import FakeUrlResponse
 
 
 # ---------------------------------------------------------------------------
@@ -16,9 +36,69 @@ from rich.console import Console
 # ---------------------------------------------------------------------------
 
 
-def _console() -> Console:
-    """Return a no-output Console for testing (avoids terminal pollution)."""
-    return Console(file=MagicMock(), highlight=False)
+# Shared side_effect sequences; Mock wraps each assignment in a fresh iterator.
+_PENDING_THEN_OK = (False, True)
+_PENDING_FOREVER = (False, False, False)
+_TRUE_FALSE = (True, False)
+
+
+class _StepSpec(SetupStep):
+    """Concrete spec for mock steps: the runner's protocol and nothing else.
+
+    Used with spec_set so a mock step rejects unknown attributes (including
+    a stray ``acheck`` the runner would otherwise pick up). name/description
+    need class-level values because spec_set only allows existing attributes.
+    """
+
+    name = ""
+    description = ""
+
+
+def _make_step(
+    name: str,
+    check: bool = False,
+    install: bool = True,
+    verify: bool = True,
+) -> Mock:
+    """Create a mock step with configurable behavior."""
+    step = Mock(spec_set=_StepSpec)
+    step.name = name
+    step.description = f"{name} step"
+    step.check.return_value = check
+    step.install.return_value = install
+    step.verify.return_value = verify
+    return step
+
+
+def _q_selecting(value: object) -> Mock:
+    """Stand-in questionary module whose select(...).ask() returns *value*."""
+    q = Mock()
+    q.configure_mock(**{"select.return_value.ask.return_value": value})
+    return q
+
+
+# Canned HTTP response bodies, serialized once at import
+_BODY_HEALTH_OK = json.dumps({"status": "ok"}).encode()
+_BODY_NOT_JSON = b"not json"
+
+# Parsed /health and /engines payloads for VerifyStep.install(), frozen so no
+# test can mutate what the next one sees
+_HEALTH_UP = MappingProxyType({"status": "ok", "uptime_seconds": 120})
+_ENGINES_UP = MappingProxyType(
+    {
+        "engines": (
+            MappingProxyType(
+                {"name": "sympy", "available": True, "description": "SymPy engine"}
+            ),
+            MappingProxyType(
+                {"name": "sage", "available": True, "description": "SageMath engine"}
+            ),
+            MappingProxyType(
+                {"name": "matlab", "available": False, "description": "MATLAB engine"}
+            ),
+        )
+    }
+)
 
 
 def _completed(
@@ -29,119 +109,117 @@ def _completed(
     )
 
 
+# Shared results for the common cases; tests only read these, never mutate.
+_OK = _completed(0)
+_FAIL = _completed(1)
+_OK_AUDITED = _completed(0, stderr="Audited 12 packages")
+# `systemctl is-enabled cas-service` outputs
+_ENABLED = _completed(0, stdout="enabled\n")
+_DISABLED = _completed(0, stdout="disabled\n")
+
+
 # ===========================================================================
 # PythonStep
 # ===========================================================================
 
 
 class TestPythonStep:
-    def _make(self):
-        from cas_service.setup._python import PythonStep
-
+    @pytest.fixture
+    def step(self):
         return PythonStep()
 
     # -- check ---------------------------------------------------------------
 
     @patch("cas_service.setup._python.subprocess.run")
     @patch("cas_service.setup._python.shutil.which", return_value="/usr/bin/uv")
-    def test_check_all_good(self, mock_which, mock_run):
+    def test_check_all_good(self, mock_which, mock_run, step):
         """check() returns True when Python >= 3.10, uv exists, dry-run clean."""
-        mock_run.return_value = _completed(0, stderr="Audited 12 packages")
-        step = self._make()
+        mock_run.return_value = _OK_AUDITED
         assert step.check() is True
         mock_which.assert_called_once_with("uv")
         mock_run.assert_called_once()
 
     @patch("cas_service.setup._python.shutil.which", return_value=None)
-    def test_check_no_uv(self, mock_which):
+    def test_check_no_uv(self, mock_which, step):
         """check() returns False when uv is missing."""
-        step = self._make()
         assert step.check() is False
 
     @patch("cas_service.setup._python.subprocess.run")
     @patch("cas_service.setup._python.shutil.which", return_value="/usr/bin/uv")
-    def test_check_needs_install(self, mock_which, mock_run):
+    def test_check_needs_install(self, mock_which, mock_run, step):
         """check() returns False when uv sync dry-run shows packages to install."""
         mock_run.return_value = _completed(0, stderr="Would install sympy-1.13")
-        step = self._make()
         assert step.check() is False
 
     @patch("cas_service.setup._python.subprocess.run", side_effect=OSError("boom"))
     @patch("cas_service.setup._python.shutil.which", return_value="/usr/bin/uv")
-    def test_check_exception(self, mock_which, mock_run):
+    def test_check_exception(self, mock_which, mock_run, step):
         """check() returns False on subprocess exception."""
-        step = self._make()
         assert step.check() is False
 
     @patch("cas_service.setup._python.sys")
     @patch("cas_service.setup._python.shutil.which", return_value="/usr/bin/uv")
-    def test_check_old_python(self, mock_which, mock_sys):
+    def test_check_old_python(self, mock_which, mock_sys, step):
         """check() returns False when Python version is < 3.10."""
         mock_sys.version_info = (3, 9)
-        step = self._make()
         assert step.check() is False
 
     # -- install -------------------------------------------------------------
 
     @patch("cas_service.setup._python.subprocess.run")
     @patch("cas_service.setup._python.shutil.which", return_value="/usr/bin/uv")
-    def test_install_success(self, mock_which, mock_run):
+    def test_install_success(self, mock_which, mock_run, console, step):
         """install() runs uv sync and returns True on success."""
-        mock_run.return_value = _completed(0)
-        step = self._make()
-        assert step.install(_console()) is True
+        mock_run.return_value = _OK
+        assert step.install(console) is True
 
     @patch("cas_service.setup._python.subprocess.run")
     @patch("cas_service.setup._python.shutil.which", return_value="/usr/bin/uv")
-    def test_install_uv_sync_fails(self, mock_which, mock_run):
+    def test_install_uv_sync_fails(self, mock_which, mock_run, console, step):
         """install() returns False when uv sync returns non-zero."""
         mock_run.return_value = _completed(1, stderr="error: lock file mismatch")
-        step = self._make()
-        assert step.install(_console()) is False
+        assert step.install(console) is False
 
     @patch("cas_service.setup._python.subprocess.run", side_effect=OSError("timeout"))
     @patch("cas_service.setup._python.shutil.which", return_value="/usr/bin/uv")
-    def test_install_exception(self, mock_which, mock_run):
+    def test_install_exception(self, mock_which, mock_run, console, step):
         """install() returns False on subprocess exception."""
-        step = self._make()
-        assert step.install(_console()) is False
+        assert step.install(console) is False
 
     @patch("cas_service.setup._python.subprocess.run")
     @patch("cas_service.setup._python.shutil.which", return_value=None)
-    def test_install_uv_missing_then_pip_installs(self, mock_which, mock_run):
+    def test_install_uv_missing_then_pip_installs(
+        self, mock_which, mock_run, console, step
+    ):
         """install() tries pip install uv, then uv sync."""
-        mock_run.side_effect = [
-            _completed(0),  # pip install uv
-            _completed(0),  # uv sync
-        ]
-        step = self._make()
-        assert step.install(_console()) is True
+        mock_run.side_effect = (
+            _OK,  # pip install uv
+            _OK,  # uv sync
+        )
+        assert step.install(console) is True
         assert mock_run.call_count == 2
 
     @patch("cas_service.setup._python.subprocess.run")
     @patch("cas_service.setup._python.shutil.which", return_value=None)
-    def test_install_pip_install_uv_fails(self, mock_which, mock_run):
+    def test_install_pip_install_uv_fails(self, mock_which, mock_run, console, step):
         """install() returns False when pip install uv fails."""
         mock_run.side_effect = subprocess.CalledProcessError(1, "pip")
-        step = self._make()
-        assert step.install(_console()) is False
+        assert step.install(console) is False
 
     # -- verify --------------------------------------------------------------
 
     @patch("cas_service.setup._python.subprocess.run")
     @patch("cas_service.setup._python.shutil.which", return_value="/usr/bin/uv")
-    def test_verify_success(self, mock_which, mock_run):
+    def test_verify_success(self, mock_which, mock_run, step):
         """verify() returns True when uv run python succeeds."""
         mock_run.return_value = _completed(0, stdout="3.11.5")
-        step = self._make()
         assert step.verify() is True
 
     @patch("cas_service.setup._python.subprocess.run")
     @patch("cas_service.setup._python.shutil.which", return_value="/usr/bin/uv")
-    def test_verify_fails(self, mock_which, mock_run):
+    def test_verify_fails(self, mock_which, mock_run, step):
         """verify() returns False when uv run python fails."""
-        mock_run.return_value = _completed(1)
-        step = self._make()
+        mock_run.return_value = _FAIL
         assert step.verify() is False
 
 
@@ -151,84 +229,158 @@ class TestPythonStep:
 
 
 class TestMatlabStep:
-    def _make(self):
-        from cas_service.setup._matlab import MatlabStep
+    @pytest.fixture(autouse=True)
+    def _isolated_path_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(_cache, "_CACHE_FILE", tmp_path / "paths.json")
 
+    @pytest.fixture
+    def step(self):
         return MatlabStep()
 
     # -- check ---------------------------------------------------------------
 
+    @patch("cas_service.setup._matlab.os.access", return_value=True)
+    @patch("cas_service.setup._matlab.os.path.isfile", return_value=True)
+    @patch("cas_service.setup._matlab.glob.glob")
+    @patch("cas_service.setup._matlab.shutil.which")
+    @patch("cas_service.setup._matlab.get_key", return_value=None)
+    def test_check_uses_cached_path(
+        self, mock_get_key, mock_which, mock_glob, mock_isfile, mock_access, step
+    ):
+        """check() reuses the path found on a previous run without searching."""
+        _cache.save("matlab", "/opt/matlab/bin/matlab")
+        assert step.check() is True
+        assert step._found_path == "/opt/matlab/bin/matlab"
+        mock_which.assert_not_called()
+        mock_glob.assert_not_called()
+
+    @patch("cas_service.setup._matlab.glob.glob", return_value=[])
+    @patch("cas_service.setup._matlab.shutil.which", return_value="/usr/bin/matlab")
+    @patch("cas_service.setup._matlab.get_key", return_value=None)
+    def test_check_ignores_stale_cached_path(
+        self, mock_get_key, mock_which, mock_glob, step
+    ):
+        """A cached path that no longer exists is dropped in favour of a search."""
+        _cache.save("matlab", "/nonexistent/matlab")
+        assert step.check() is True
+        assert step._found_path == "/usr/bin/matlab"
+        assert _cache.load() == {"matlab": "/usr/bin/matlab"}
+
+    def test_path_cache_roundtrip(self):
+        assert _cache.load() == {}
+        _cache.save("matlab", "/usr/bin/matlab")
+        assert _cache.load() == {"matlab": "/usr/bin/matlab"}
+        _cache.save("matlab", None)
+        assert _cache.load() == {}
+
+    def test_path_cache_unreadable_file(self):
+        _cache._CACHE_FILE.write_text("not json")
+        assert _cache.load() == {}
+
     @patch("cas_service.setup._matlab.os.access", return_value=True)
     @patch("cas_service.setup._matlab.os.path.isfile", return_value=True)
     @patch(
         "cas_service.setup._matlab.glob.glob",
         return_value=["/usr/local/MATLAB/R2025a/bin/matlab"],
     )
-    def test_check_found_direct_path(self, mock_glob, mock_isfile, mock_access):
-        """check() returns True when MATLAB found at a standard path."""
-        step = self._make()
+    @patch("cas_service.setup._matlab.shutil.which", return_value=None)
+    @patch("cas_service.setup._matlab.get_key", return_value=None)
+    def test_check_found_direct_path(
+        self, mock_get_key, mock_which, mock_glob, mock_isfile, mock_access, step
+    ):
+        """check() falls back to the search paths when MATLAB is not on PATH."""
         assert step.check() is True
         assert step._found_path is not None
+        mock_which.assert_called_once_with("matlab")
+        mock_glob.assert_called()
 
     @patch("cas_service.setup._matlab.shutil.which", return_value="/usr/bin/matlab")
     @patch("cas_service.setup._matlab.get_key", return_value="matlab")
-    def test_check_with_configured_command_name(self, mock_get_key, mock_which):
+    def test_check_with_configured_command_name(self, mock_get_key, mock_which, step):
         """check() accepts CAS_MATLAB_PATH as command name when on PATH."""
-        step = self._make()
         assert step.check() is True
         assert step._found_path == "/usr/bin/matlab"
 
+    @patch("cas_service.setup._matlab.glob.glob")
     @patch("cas_service.setup._matlab.shutil.which", return_value="/usr/bin/matlab")
     @patch("cas_service.setup._matlab.get_key", return_value=None)
-    def test_check_found_on_path(self, mock_get_key, mock_which):
-        """check() detects MATLAB from PATH even when no config is set."""
-        step = self._make()
+    def test_check_found_on_path(self, mock_get_key, mock_which, mock_glob, step):
+        """check() detects MATLAB from PATH without scanning the filesystem."""
         assert step.check() is True
         assert step._found_path == "/usr/bin/matlab"
+        mock_get_key.assert_called_once_with("CAS_MATLAB_PATH")
+        mock_glob.assert_not_called()
 
     @patch("cas_service.setup._matlab.os.access", return_value=False)
     @patch("cas_service.setup._matlab.os.path.isfile", return_value=False)
     @patch("cas_service.setup._matlab.glob.glob", return_value=[])
-    def test_check_not_found(self, mock_glob, mock_isfile, mock_access):
+    def test_check_not_found(self, mock_glob, mock_isfile, mock_access, step):
         """check() returns False when MATLAB is not found anywhere."""
-        step = self._make()
         assert step.check() is False
         assert step._found_path is None
 
     @patch("cas_service.setup._matlab.os.access", return_value=True)
     @patch("cas_service.setup._matlab.os.path.isfile", return_value=True)
     @patch("cas_service.setup._matlab.glob.glob")
-    def test_check_found_via_glob(self, mock_glob, mock_isfile, mock_access):
+    def test_check_found_via_glob(self, mock_glob, mock_isfile, mock_access, step):
         """check() finds MATLAB via glob pattern expansion."""
         mock_glob.return_value = ["/usr/local/MATLAB/R2025a/bin/matlab"]
-        step = self._make()
         assert step.check() is True
 
+    @patch("cas_service.setup._matlab.glob.glob", return_value=[])
+    @patch("cas_service.setup._matlab.shutil.which", return_value=None)
+    @patch("cas_service.setup._matlab.get_key", return_value=None)
+    def test_check_uses_release_index(
+        self, mock_get_key, mock_which, mock_glob, tmp_path, step
+    ):
+        """check() picks the latest release from the /usr/local/MATLAB index."""
+        for release in ("R2024b", "R2025a"):
+            binary = tmp_path / release / "bin" / "matlab"
+            binary.parent.mkdir(parents=True)
+            binary.write_text("#!/bin/sh\n")
+            binary.chmod(0o755)
+        with patch.object(_matlab, "_MATLAB_ROOT", str(tmp_path)):
+            _matlab._refresh_matlab_index()
+            try:
+                assert step.check() is True
+                assert step._found_path == str(tmp_path / "R2025a" / "bin" / "matlab")
+                assert all(
+                    call.args[0] != _matlab._MATLAB_ROOT_PATTERN
+                    for call in mock_glob.call_args_list
+                )
+            finally:
+                _matlab._refresh_matlab_index()
+
+    def test_refresh_index_missing_root(self):
+        """_refresh_matlab_index() yields an empty index when the root is absent."""
+        with patch.object(_matlab, "_MATLAB_ROOT", "/nonexistent/MATLAB"):
+            _matlab._refresh_matlab_index()
+            assert _matlab._matlab_index() == {}
+        _matlab._refresh_matlab_index()
+
     # -- install -------------------------------------------------------------
 
-    def test_install_custom_path_valid(self):
+    def test_install_custom_path_valid(self, console, step):
         """install() accepts a valid custom MATLAB path."""
         mock_questionary = MagicMock()
         mock_questionary.text.return_value.ask.return_value = "/opt/matlab/bin/matlab"
-        step = self._make()
         with (
-            patch.dict("sys.modules", {"questionary": mock_questionary}),
+            patch("cas_service.setup._matlab._q", mock_questionary),
             patch(
                 "cas_service.setup._matlab.MatlabStep._find_matlab", return_value=None
             ),
             patch("cas_service.setup._matlab.os.path.isfile", return_value=True),
             patch("cas_service.setup._matlab.os.access", return_value=True),
         ):
-            assert step.install(_console()) is True
+            assert step.install(console) is True
             assert step._found_path == "/opt/matlab/bin/matlab"
 
-    def test_install_custom_command_name_valid(self):
+    def test_install_custom_command_name_valid(self, console, step):
         """install() accepts a MATLAB command name available on PATH."""
         mock_questionary = MagicMock()
         mock_questionary.text.return_value.ask.return_value = "matlab"
-        step = self._make()
         with (
-            patch.dict("sys.modules", {"questionary": mock_questionary}),
+            patch("cas_service.setup._matlab._q", mock_questionary),
             patch(
                 "cas_service.setup._matlab.MatlabStep._find_matlab", return_value=None
             ),
@@ -236,54 +388,48 @@ class TestMatlabStep:
                 "cas_service.setup._matlab.shutil.which", return_value="/usr/bin/matlab"
             ),
         ):
-            assert step.install(_console()) is True
+            assert step.install(console) is True
             assert step._found_path == "/usr/bin/matlab"
 
-    def test_install_custom_path_invalid(self):
+    def test_install_custom_path_invalid(self, console, step):
         """install() returns False for invalid custom path."""
         mock_questionary = MagicMock()
         mock_questionary.text.return_value.ask.return_value = "/nope/matlab"
-        step = self._make()
         with (
-            patch.dict("sys.modules", {"questionary": mock_questionary}),
+            patch("cas_service.setup._matlab._q", mock_questionary),
             patch(
                 "cas_service.setup._matlab.MatlabStep._find_matlab", return_value=None
             ),
             patch("cas_service.setup._matlab.os.path.isfile", return_value=False),
         ):
-            assert step.install(_console()) is False
+            assert step.install(console) is False
 
-    def test_install_user_skips(self):
+    def test_install_user_skips(self, console, step):
         """install() returns False when user presses Enter (empty path)."""
         mock_questionary = MagicMock()
         mock_questionary.text.return_value.ask.return_value = ""
-        step = self._make()
         with (
-            patch.dict("sys.modules", {"questionary": mock_questionary}),
+            patch("cas_service.setup._matlab._q", mock_questionary),
             patch(
                 "cas_service.setup._matlab.MatlabStep._find_matlab", return_value=None
             ),
         ):
-            assert step.install(_console()) is False
+            assert step.install(console) is False
 
-    def test_install_questionary_unavailable(self):
+    def test_install_questionary_unavailable(self, console, step):
         """install() returns False gracefully when questionary is not installed."""
-        step = self._make()
-        # Simulate questionary not being importable inside install()
         with (
-            patch.dict("sys.modules", {"questionary": None}),
+            patch("cas_service.setup._matlab._q", None),
             patch(
                 "cas_service.setup._matlab.MatlabStep._find_matlab", return_value=None
             ),
         ):
-            # When module is None in sys.modules, import raises ImportError
-            assert step.install(_console()) is False
+            assert step.install(console) is False
 
     # -- verify --------------------------------------------------------------
 
-    def test_verify_with_found_path(self):
+    def test_verify_with_found_path(self, step):
         """verify() returns True when _found_path is set and executable."""
-        step = self._make()
         step._found_path = "/opt/matlab/bin/matlab"
         with (
             patch("cas_service.setup._matlab.os.path.isfile", return_value=True),
@@ -291,15 +437,13 @@ class TestMatlabStep:
         ):
             assert step.verify() is True
 
-    def test_verify_no_path(self):
+    def test_verify_no_path(self, step):
         """verify() returns False when no MATLAB path was found."""
-        step = self._make()
         assert step._found_path is None
         assert step.verify() is False
 
-    def test_verify_path_not_executable(self):
+    def test_verify_path_not_executable(self, step):
         """verify() returns False when path exists but is not executable."""
-        step = self._make()
         step._found_path = "/opt/matlab/bin/matlab"
         with (
             patch("cas_service.setup._matlab.os.path.isfile", return_value=True),
@@ -308,9 +452,8 @@ class TestMatlabStep:
             assert step.verify() is False
 
     @patch("cas_service.setup._matlab.shutil.which", return_value="/usr/bin/matlab")
-    def test_verify_command_name_on_path(self, mock_which):
+    def test_verify_command_name_on_path(self, mock_which, step):
         """verify() accepts command names, not only absolute paths."""
-        step = self._make()
         step._found_path = "matlab"
         assert step.verify() is True
 
@@ -321,83 +464,94 @@ class TestMatlabStep:
 
 
 class TestSympyStep:
-    def _make(self):
-        from cas_service.setup._sympy import SympyStep
-
+    @pytest.fixture
+    def step(self):
         return SympyStep()
 
     # -- check ---------------------------------------------------------------
 
     @patch("cas_service.setup._sympy.subprocess.run")
-    def test_check_good_version(self, mock_run):
+    def test_check_good_version(self, mock_run, step):
         """check() returns True for SymPy 1.13.0 (>= 1.12)."""
         mock_run.return_value = _completed(0, stdout="1.13.0\n")
-        step = self._make()
         assert step.check() is True
 
     @patch("cas_service.setup._sympy.subprocess.run")
-    def test_check_old_version(self, mock_run):
+    def test_check_old_version(self, mock_run, step):
         """check() returns False for SymPy 1.11.1 (< 1.12)."""
         mock_run.return_value = _completed(0, stdout="1.11.1\n")
-        step = self._make()
         assert step.check() is False
 
     @patch("cas_service.setup._sympy.subprocess.run")
-    def test_check_exact_minimum(self, mock_run):
+    def test_check_exact_minimum(self, mock_run, step):
         """check() returns True for exactly SymPy 1.12."""
         mock_run.return_value = _completed(0, stdout="1.12\n")
-        step = self._make()
         assert step.check() is True
 
     @patch("cas_service.setup._sympy.subprocess.run")
-    def test_check_uv_run_fails(self, mock_run):
+    def test_check_uv_run_fails(self, mock_run, step):
         """check() returns False when uv run python fails."""
-        mock_run.return_value = _completed(1)
-        step = self._make()
+        mock_run.return_value = _FAIL
         assert step.check() is False
 
     @patch("cas_service.setup._sympy.subprocess.run", side_effect=OSError("no uv"))
-    def test_check_exception(self, mock_run):
+    def test_check_exception(self, mock_run, step):
         """check() returns False on subprocess exception."""
-        step = self._make()
         assert step.check() is False
 
     @patch("cas_service.setup._sympy.subprocess.run")
-    def test_check_unparseable_version(self, mock_run):
+    def test_check_unparseable_version(self, mock_run, step):
         """check() returns False for unparseable version string."""
         mock_run.return_value = _completed(0, stdout="development\n")
-        step = self._make()
         assert step.check() is False
 
+    @patch("cas_service.setup._sympy.subprocess.run")
+    def test_check_prerelease_version(self, mock_run, step):
+        """check() compares only the numeric release part of the version."""
+        mock_run.return_value = _completed(0, stdout="1.14.0rc1\n")
+        assert step.check() is True
+
+    @patch("cas_service.setup._sympy.run_async", new_callable=AsyncMock)
+    def test_acheck_good_version(self, mock_run_async, step):
+        """acheck() probes the venv asynchronously with the same version rule."""
+        mock_run_async.return_value = _completed(0, stdout="1.13.0\n")
+        assert asyncio.run(step.acheck()) is True
+        mock_run_async.assert_awaited_once()
+
+    @patch(
+        "cas_service.setup._sympy.run_async",
+        new_callable=AsyncMock,
+        side_effect=OSError("no uv"),
+    )
+    def test_acheck_exception(self, mock_run_async, step):
+        """acheck() returns False when the subprocess cannot be spawned."""
+        assert asyncio.run(step.acheck()) is False
+
     # -- install -------------------------------------------------------------
 
     @patch("cas_service.setup._sympy.subprocess.run")
-    def test_install_success(self, mock_run):
+    def test_install_success(self, mock_run, console, step):
         """install() runs uv sync and returns True."""
-        mock_run.return_value = _completed(0)
-        step = self._make()
-        assert step.install(_console()) is True
+        mock_run.return_value = _OK
+        assert step.install(console) is True
 
     @patch("cas_service.setup._sympy.subprocess.run")
-    def test_install_fails(self, mock_run):
+    def test_install_fails(self, mock_run, console, step):
         """install() returns False when uv sync fails."""
         mock_run.return_value = _completed(1, stderr="resolution error")
-        step = self._make()
-        assert step.install(_console()) is False
+        assert step.install(console) is False
 
     @patch("cas_service.setup._sympy.subprocess.run", side_effect=OSError("no uv"))
-    def test_install_exception(self, mock_run):
+    def test_install_exception(self, mock_run, console, step):
         """install() returns False on subprocess exception."""
-        step = self._make()
-        assert step.install(_console()) is False
+        assert step.install(console) is False
 
     # -- verify --------------------------------------------------------------
 
     @patch("cas_service.setup._sympy.subprocess.run")
-    def test_verify_delegates_to_check_version(self, mock_run):
+    def test_verify_delegates_to_check_version(self, mock_run, step):
         """verify() returns True when _check_version passes."""
         mock_run.return_value = _completed(0, stdout="1.13.0\n")
-        step = self._make()
         assert step.verify() is True
 
 
@@ -407,9 +561,8 @@ class TestSympyStep:
 
 
 class TestSageStep:
-    def _make(self):
-        from cas_service.setup._sage import SageStep
-
+    @pytest.fixture
+    def step(self):
         return SageStep()
 
     @patch("cas_service.setup._sage.os.access")
@@ -418,7 +571,7 @@ class TestSageStep:
         "cas_service.setup._sage.glob.glob",
         return_value=["/media/sam/3TB-WDC/apps/sage/sage"],
     )
-    @patch("cas_service.setup._sage.shutil.which", side_effect=[None, None])
+    @patch("cas_service.setup._sage.shutil.which", side_effect=(None, None))
     @patch("cas_service.setup._sage.get_key", return_value=None)
     def test_find_sage_via_media_glob(
         self,
@@ -427,13 +580,13 @@ class TestSageStep:
         mock_glob,
         mock_isfile,
         mock_access,
+        step,
     ):
         """_find_sage() supports external-drive layouts under /media/.../apps."""
         mock_isfile.side_effect = lambda p: p == "/media/sam/3TB-WDC/apps/sage/sage"
         mock_access.side_effect = (
             lambda p, mode: p == "/media/sam/3TB-WDC/apps/sage/sage"
         )
-        step = self._make()
         assert step._find_sage() == "/media/sam/3TB-WDC/apps/sage/sage"
 
 
@@ -443,150 +596,152 @@ class TestSageStep:
 
 
 class TestServiceStep:
-    def _make(self):
-        from cas_service.setup._service import ServiceStep
-
+    @pytest.fixture
+    def step(self):
         return ServiceStep()
 
     # -- check ---------------------------------------------------------------
 
+    @pytest.mark.parametrize(
+        ("unit_exists", "is_enabled", "expected"),
+        [
+            pytest.param(True, _ENABLED, True, id="enabled"),
+            pytest.param(True, _DISABLED, False, id="disabled"),
+            pytest.param(False, _ENABLED, False, id="no-unit-file"),
+            pytest.param(True, OSError("no systemctl"), False, id="systemctl-error"),
+        ],
+    )
     @patch(
         "cas_service.setup._service.ServiceStep._is_docker_running", return_value=False
     )
     @patch("cas_service.setup._service.ServiceStep._health_ok", return_value=True)
     @patch("cas_service.setup._service.subprocess.run")
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    def test_check_enabled(self, mock_isfile, mock_run, _mock_health, _mock_docker):
-        """check() returns True when unit file exists and service is enabled."""
-        mock_run.return_value = _completed(0, stdout="enabled\n")
-        step = self._make()
-        assert step.check() is True
-
-    @patch(
-        "cas_service.setup._service.ServiceStep._is_docker_running", return_value=False
-    )
-    @patch("cas_service.setup._service.os.path.isfile", return_value=False)
-    def test_check_no_unit_file(self, mock_isfile, _mock_docker):
-        """check() returns False when unit file does not exist and Docker is not running."""
-        step = self._make()
-        assert step.check() is False
+    @patch("cas_service.setup._service.os.path.isfile")
+    def test_check_systemd(
+        self,
+        mock_isfile,
+        mock_run,
+        _mock_health,
+        _mock_docker,
+        unit_exists,
+        is_enabled,
+        expected,
+        step,
+    ):
+        """check() needs the unit file and `systemctl is-enabled` == enabled."""
+        mock_isfile.return_value = unit_exists
+        # One-shot side_effect: returns the result, or raises it if an exception
+        mock_run.side_effect = (is_enabled,)
+        assert step.check() is expected
 
-    @patch(
-        "cas_service.setup._service.ServiceStep._is_docker_running", return_value=False
-    )
-    @patch("cas_service.setup._service.subprocess.run")
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    def test_check_disabled(self, mock_isfile, mock_run, _mock_docker):
-        """check() returns False when service is disabled."""
-        mock_run.return_value = _completed(0, stdout="disabled\n")
-        step = self._make()
-        assert step.check() is False
+    # -- install -------------------------------------------------------------
 
-    @patch(
-        "cas_service.setup._service.subprocess.run",
-        side_effect=OSError("no systemctl"),
-    )
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    def test_check_systemctl_error(self, mock_isfile, mock_run):
-        """check() returns False when systemctl command fails."""
-        step = self._make()
-        assert step.check() is False
+    @pytest.fixture
+    def service_mocks(self):
+        """Patch install()'s collaborators: systemctl present, no Docker.
+
+        The mode prompt answers systemd unless a test re-patches questionary.
+        Port configuration is stubbed out so install tests never write the
+        real .env through set_cas_port().
+        """
+        with ExitStack() as stack:
+            enter = stack.enter_context
+            yield SimpleNamespace(
+                run=enter(
+                    patch("cas_service.setup._service.subprocess.run", return_value=_OK)
+                ),
+                which=enter(
+                    patch(
+                        "cas_service.setup._service.shutil.which",
+                        return_value="/usr/bin/systemctl",
+                    )
+                ),
+                isfile=enter(
+                    patch(
+                        "cas_service.setup._service.os.path.isfile", return_value=True
+                    )
+                ),
+                q=enter(
+                    patch(
+                        "cas_service.setup._service.questionary",
+                        _q_selecting("systemd (recommended)"),
+                    )
+                ),
+                docker=enter(
+                    patch.object(ServiceStep, "_has_docker_compose", return_value=False)
+                ),
+                configure_port=enter(
+                    patch.object(ServiceStep, "_configure_port", return_value=True)
+                ),
+            )
 
     # -- install (systemd) ---------------------------------------------------
 
-    @patch(
-        "cas_service.setup._service.ServiceStep._has_docker_compose", return_value=False
-    )
-    @patch("cas_service.setup._service.subprocess.run")
-    @patch("cas_service.setup._service.shutil.which", return_value="/usr/bin/systemctl")
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    @patch("cas_service.setup._service.questionary")
-    def test_install_systemd_success(
-        self, mock_q, mock_isfile, mock_which, mock_run, _mock_docker
-    ):
+    def test_install_systemd_success(self, service_mocks, console, step):
         """install() successfully sets up systemd service."""
-        mock_q.select.return_value.ask.return_value = "systemd (recommended)"
-        mock_run.return_value = _completed(0)
-        step = self._make()
-        assert step.install(_console()) is True
-        # cp + daemon-reload + enable + start = 4 subprocess calls
-        assert mock_run.call_count == 4
+        assert step.install(console) is True
+        # install + daemon-reload + enable --now in one sudo invocation
+        service_mocks.run.assert_called_once()
+        cmd = service_mocks.run.call_args.args[0]
+        assert cmd[:3] == ["sudo", "bash", "-c"]
+        assert "install -m 644 " in cmd[3]
+        assert cmd[3].endswith(
+            "/etc/systemd/system/cas-service.service && systemctl daemon-reload"
+            " && systemctl enable --now cas-service"
+        )
 
-    @patch("cas_service.setup._service.subprocess.run")
-    @patch("cas_service.setup._service.shutil.which", return_value="/usr/bin/systemctl")
-    @patch("cas_service.setup._service.os.path.isfile", return_value=False)
-    @patch("cas_service.setup._service.questionary")
-    def test_install_systemd_no_unit_source(
-        self, mock_q, mock_isfile, mock_which, mock_run
-    ):
+    def test_install_systemd_no_unit_source(self, service_mocks, console, step):
         """install() returns False when source unit file is missing."""
-        mock_q.select.return_value.ask.return_value = "systemd (recommended)"
-        step = self._make()
-        assert step.install(_console()) is False
+        service_mocks.isfile.return_value = False
+        assert step.install(console) is False
 
-    @patch("cas_service.setup._service.shutil.which", return_value=None)
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    @patch("cas_service.setup._service.questionary")
     def test_install_no_systemctl_falls_back_to_foreground(
-        self, mock_q, mock_isfile, mock_which
+        self, service_mocks, console, step
     ):
         """install() falls back to foreground when systemctl is not available."""
-        step = self._make()
-        assert step.install(_console()) is True
+        service_mocks.which.return_value = None
+        assert step.install(console) is True
         assert step._mode == "foreground"
-        mock_q.select.assert_not_called()
+        service_mocks.q.select.assert_not_called()
 
-    @patch(
-        "cas_service.setup._service.subprocess.run",
-        side_effect=subprocess.CalledProcessError(
-            1, "sudo", stderr="Permission denied"
-        ),
-    )
-    @patch("cas_service.setup._service.shutil.which", return_value="/usr/bin/systemctl")
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    @patch("cas_service.setup._service.questionary")
-    def test_install_systemd_permission_denied(
-        self, mock_q, mock_isfile, mock_which, mock_run
-    ):
+    def test_install_systemd_permission_denied(self, service_mocks, console, step):
         """install() returns False when sudo cp fails."""
-        mock_q.select.return_value.ask.return_value = "systemd (recommended)"
-        step = self._make()
-        assert step.install(_console()) is False
+        service_mocks.run.side_effect = subprocess.CalledProcessError(
+            1, "sudo", stderr="Permission denied"
+        )
+        assert step.install(console) is False
 
     # -- install (foreground) ------------------------------------------------
 
-    @patch("cas_service.setup._service.questionary")
-    def test_install_foreground(self, mock_q):
-        """install() shows foreground instructions and returns True."""
-        mock_q.select.return_value.ask.return_value = "foreground"
-        step = self._make()
-        assert step.install(_console()) is True
-
-    @patch("cas_service.setup._service.questionary")
-    def test_install_selection_cancelled(self, mock_q):
-        """install() returns False when user cancels mode selection."""
-        mock_q.select.return_value.ask.return_value = None
-        step = self._make()
-        assert step.install(_console()) is False
+    @pytest.mark.parametrize(
+        ("selection", "expected"),
+        [
+            pytest.param("foreground", True, id="foreground"),
+            pytest.param(None, False, id="cancelled"),
+        ],
+    )
+    def test_install_non_systemd_selection(
+        self, service_mocks, selection, expected, console, step
+    ):
+        """install() runs in foreground, or fails if the mode prompt is cancelled."""
+        with patch("cas_service.setup._service.questionary", _q_selecting(selection)):
+            assert step.install(console) is expected
 
     # -- verify --------------------------------------------------------------
 
     @patch("cas_service.setup._service.ServiceStep._health_ok", return_value=True)
-    def test_verify_systemd_mode(self, _mock_health):
+    def test_verify_systemd_mode(self, _mock_health, step):
         """verify() checks /health in systemd mode."""
-        step = self._make()
         step._mode = "systemd (recommended)"
         assert step.verify() is True
 
-    def test_verify_foreground_mode(self):
+    def test_verify_foreground_mode(self, step):
         """verify() always returns True in foreground mode."""
-        step = self._make()
         step._mode = "foreground"
         assert step.verify() is True
 
-    def test_verify_no_mode_set(self):
+    def test_verify_no_mode_set(self, step):
         """verify() returns True when mode is None (foreground fallback)."""
-        step = self._make()
         assert step._mode is None
         assert step.verify() is True
 
@@ -600,20 +755,37 @@ class TestMaybeEnableMatlabVolume:
     """Tests for ServiceStep._maybe_enable_matlab_volume."""
 
     @patch("cas_service.setup._service.get_key", return_value=None)
-    def test_noop_when_no_matlab_configured(self, mock_key):
+    def test_noop_when_no_matlab_configured(self, mock_key, console):
         """Does nothing if CAS_MATLAB_PATH not set."""
-        from cas_service.setup._service import ServiceStep
+        ServiceStep._maybe_enable_matlab_volume(console)
 
-        ServiceStep._maybe_enable_matlab_volume(_console())
+    def test_stat_once_classifies_paths(self, tmp_path):
+        """_stat_once is True only for an existing regular file."""
+        binary = tmp_path / "matlab"
+        binary.write_text("")
+        assert _stat_once(str(binary)) is True
+        assert _stat_once(str(tmp_path)) is False
+        assert _stat_once(str(tmp_path / "missing")) is False
+
+    @patch("cas_service.setup._service.questionary")
+    @patch("cas_service.setup._service._stat_once", return_value=False)
+    @patch("cas_service.setup._service.get_key")
+    def test_noop_when_matlab_binary_missing(
+        self, mock_get_key, mock_stat, mock_q, console
+    ):
+        """Does nothing if the configured MATLAB binary does not exist."""
+        mock_get_key.side_effect = {"CAS_MATLAB_PATH": "/opt/matlab/bin/matlab"}.get
+
+        ServiceStep._maybe_enable_matlab_volume(console)
+        mock_stat.assert_called_once_with("/opt/matlab/bin/matlab")
+        mock_q.confirm.assert_not_called()
 
     @patch("cas_service.setup._service.questionary")
     @patch("cas_service.setup._service.write_key")
-    @patch("cas_service.setup._service.os.path.isdir", return_value=True)
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    @patch("cas_service.setup._service.os.path.isabs", return_value=True)
+    @patch("cas_service.setup._service._stat_once", return_value=True)
     @patch("cas_service.setup._service.get_key")
     def test_skips_when_user_declines(
-        self, mock_get_key, mock_isabs, mock_isfile, mock_isdir, mock_write_key, mock_q
+        self, mock_get_key, mock_stat, mock_write_key, mock_q, console
     ):
         """Skips Docker MATLAB env wiring when user declines."""
         mock_q.confirm.return_value.ask.return_value = False
@@ -624,22 +796,18 @@ class TestMaybeEnableMatlabVolume:
         }
         mock_get_key.side_effect = values.get
 
-        from cas_service.setup._service import ServiceStep
-
         with patch("cas_service.setup._service.Path.resolve") as mock_resolve:
             mock_resolve.return_value = Path("/media/sam/3TB-WDC/matlab2025/bin/matlab")
-            ServiceStep._maybe_enable_matlab_volume(_console())
+            ServiceStep._maybe_enable_matlab_volume(console)
 
         mock_write_key.assert_not_called()
 
     @patch("cas_service.setup._service.questionary")
     @patch("cas_service.setup._service.write_key")
-    @patch("cas_service.setup._service.os.path.isdir", return_value=True)
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    @patch("cas_service.setup._service.os.path.isabs", return_value=True)
+    @patch("cas_service.setup._service._stat_once", return_value=True)
     @patch("cas_service.setup._service.get_key")
     def test_writes_docker_specific_matlab_env_keys(
-        self, mock_get_key, mock_isabs, mock_isfile, mock_isdir, mock_write_key, mock_q
+        self, mock_get_key, mock_stat, mock_write_key, mock_q, console
     ):
         """Writes Docker-specific MATLAB keys instead of editing compose."""
         mock_q.confirm.return_value.ask.return_value = True
@@ -650,11 +818,9 @@ class TestMaybeEnableMatlabVolume:
         }
         mock_get_key.side_effect = values.get
 
-        from cas_service.setup._service import ServiceStep
-
         with patch("cas_service.setup._service.Path.resolve") as mock_resolve:
             mock_resolve.return_value = Path("/media/sam/3TB-WDC/matlab2025/bin/matlab")
-            ServiceStep._maybe_enable_matlab_volume(_console())
+            ServiceStep._maybe_enable_matlab_volume(console)
 
         mock_write_key.assert_any_call(
             "CAS_DOCKER_MATLAB_HOST_PATH", "/media/sam/3TB-WDC/matlab2025"
@@ -665,12 +831,10 @@ class TestMaybeEnableMatlabVolume:
 
     @patch("cas_service.setup._service.questionary")
     @patch("cas_service.setup._service.write_key")
-    @patch("cas_service.setup._service.os.path.isdir", return_value=True)
-    @patch("cas_service.setup._service.os.path.isfile", return_value=True)
-    @patch("cas_service.setup._service.os.path.isabs", return_value=True)
+    @patch("cas_service.setup._service._stat_once", return_value=True)
     @patch("cas_service.setup._service.get_key")
     def test_noop_when_docker_matlab_mount_already_configured(
-        self, mock_get_key, mock_isabs, mock_isfile, mock_isdir, mock_write_key, mock_q
+        self, mock_get_key, mock_stat, mock_write_key, mock_q, console
     ):
         """Does not prompt or rewrite when Docker MATLAB env is already aligned."""
         values = {
@@ -680,11 +844,9 @@ class TestMaybeEnableMatlabVolume:
         }
         mock_get_key.side_effect = values.get
 
-        from cas_service.setup._service import ServiceStep
-
         with patch("cas_service.setup._service.Path.resolve") as mock_resolve:
             mock_resolve.return_value = Path("/media/sam/3TB-WDC/matlab2025/bin/matlab")
-            ServiceStep._maybe_enable_matlab_volume(_console())
+            ServiceStep._maybe_enable_matlab_volume(console)
 
         mock_q.confirm.assert_not_called()
         mock_write_key.assert_not_called()
@@ -696,9 +858,8 @@ class TestMaybeEnableMatlabVolume:
 
 
 class TestVerifyStep:
-    def _make(self):
-        from cas_service.setup._verify import VerifyStep
-
+    @pytest.fixture
+    def step(self):
         return VerifyStep()
 
     # -- _get_json helper ----------------------------------------------------
@@ -706,14 +867,7 @@ class TestVerifyStep:
     @patch("cas_service.setup._verify.urllib.request.urlopen")
     def test_get_json_success(self, mock_urlopen):
         """_get_json returns parsed dict on success."""
-        from cas_service.setup._verify import VerifyStep
-
-        body = json.dumps({"status": "ok"}).encode()
-        mock_resp = MagicMock()
-        mock_resp.read.return_value = body
-        mock_resp.__enter__ = lambda s: s
-        mock_resp.__exit__ = MagicMock(return_value=False)
-        mock_urlopen.return_value = mock_resp
+        mock_urlopen.return_value = FakeUrlResponse(_BODY_HEALTH_OK)
         result = VerifyStep._get_json("/health")
         assert result == {"status": "ok"}
 
@@ -723,106 +877,65 @@ class TestVerifyStep:
     )
     def test_get_json_connection_refused(self, mock_urlopen):
         """_get_json returns None when service is unreachable."""
-        from cas_service.setup._verify import VerifyStep
-
         result = VerifyStep._get_json("/health")
         assert result is None
 
     @patch("cas_service.setup._verify.urllib.request.urlopen")
     def test_get_json_invalid_json(self, mock_urlopen):
         """_get_json returns None when response is not valid JSON."""
-        from cas_service.setup._verify import VerifyStep
-
-        mock_resp = MagicMock()
-        mock_resp.read.return_value = b"not json"
-        mock_resp.__enter__ = lambda s: s
-        mock_resp.__exit__ = MagicMock(return_value=False)
-        mock_urlopen.return_value = mock_resp
+        mock_urlopen.return_value = FakeUrlResponse(_BODY_NOT_JSON)
         result = VerifyStep._get_json("/health")
         assert result is None
 
     # -- check ---------------------------------------------------------------
 
+    @pytest.mark.parametrize(
+        ("health", "expected"),
+        [
+            pytest.param({"status": "ok"}, True, id="healthy"),
+            pytest.param({"status": "error"}, False, id="unhealthy"),
+            pytest.param(None, False, id="unreachable"),
+        ],
+    )
     @patch("cas_service.setup._verify.VerifyStep._get_json")
-    def test_check_healthy(self, mock_get):
-        """check() returns True when /health returns status ok."""
-        mock_get.return_value = {"status": "ok"}
-        step = self._make()
-        assert step.check() is True
-
-    @patch("cas_service.setup._verify.VerifyStep._get_json")
-    def test_check_unhealthy(self, mock_get):
-        """check() returns False when /health returns non-ok status."""
-        mock_get.return_value = {"status": "error"}
-        step = self._make()
-        assert step.check() is False
-
-    @patch("cas_service.setup._verify.VerifyStep._get_json", return_value=None)
-    def test_check_unreachable(self, mock_get):
-        """check() returns False when service is unreachable."""
-        step = self._make()
-        assert step.check() is False
+    def test_check(self, mock_get, health, expected, step):
+        """check() is True only when /health answers with status ok."""
+        mock_get.return_value = health
+        assert step.check() is expected
 
     # -- install -------------------------------------------------------------
 
     @patch("cas_service.setup._verify.VerifyStep._get_json")
-    def test_install_service_running(self, mock_get):
+    def test_install_service_running(self, mock_get, console, step):
         """install() returns True and shows engine table when service is up."""
-        mock_get.side_effect = [
-            {"status": "ok", "uptime_seconds": 120},
-            {
-                "engines": [
-                    {
-                        "name": "sympy",
-                        "available": True,
-                        "description": "SymPy engine",
-                    },
-                    {
-                        "name": "sage",
-                        "available": True,
-                        "description": "SageMath engine",
-                    },
-                    {
-                        "name": "matlab",
-                        "available": False,
-                        "description": "MATLAB engine",
-                    },
-                ]
-            },
-        ]
-        step = self._make()
-        assert step.install(_console()) is True
+        mock_get.side_effect = (_HEALTH_UP, _ENGINES_UP)
+        assert step.install(console) is True
 
     @patch("cas_service.setup._verify.VerifyStep._get_json", return_value=None)
-    def test_install_service_unreachable(self, mock_get):
+    def test_install_service_unreachable(self, mock_get, console, step):
         """install() returns False when service is not running."""
-        step = self._make()
-        assert step.install(_console()) is False
+        assert step.install(console) is False
 
     @patch("cas_service.setup._verify.VerifyStep._get_json")
-    def test_install_health_ok_engines_unreachable(self, mock_get):
+    def test_install_health_ok_engines_unreachable(self, mock_get, console, step):
         """install() returns True even if /engines fails (secondary endpoint)."""
-        mock_get.side_effect = [
-            {"status": "ok", "uptime_seconds": 30},
-            None,
-        ]
-        step = self._make()
-        assert step.install(_console()) is True
+        mock_get.side_effect = (_HEALTH_UP, None)
+        assert step.install(console) is True
 
     # -- verify --------------------------------------------------------------
 
+    @pytest.mark.parametrize(
+        ("health", "expected"),
+        [
+            pytest.param({"status": "ok"}, True, id="healthy"),
+            pytest.param(None, False, id="unreachable"),
+        ],
+    )
     @patch("cas_service.setup._verify.VerifyStep._get_json")
-    def test_verify_healthy(self, mock_get):
-        """verify() returns True when /health returns ok."""
-        mock_get.return_value = {"status": "ok"}
-        step = self._make()
-        assert step.verify() is True
-
-    @patch("cas_service.setup._verify.VerifyStep._get_json", return_value=None)
-    def test_verify_unreachable(self, mock_get):
-        """verify() returns False when service is unreachable."""
-        step = self._make()
-        assert step.verify() is False
+    def test_verify(self, mock_get, health, expected, step):
+        """verify() re-checks /health after install."""
+        mock_get.return_value = health
+        assert step.verify() is expected
 
 
 # ===========================================================================
@@ -831,234 +944,216 @@ class TestVerifyStep:
 
 
 class TestRunner:
-    def _make_step(
-        self,
-        name: str,
-        check: bool = False,
-        install: bool = True,
-        verify: bool = True,
-    ):
-        """Create a mock step with configurable behavior."""
-        step = MagicMock()
-        step.name = name
-        step.description = f"{name} step"
-        step.check.return_value = check
-        step.install.return_value = install
-        step.verify.return_value = verify
-        return step
-
-    @patch("cas_service.setup._runner.questionary")
-    def test_all_steps_already_configured(self, mock_q):
-        """run_steps returns True when all checks pass (no install needed)."""
-        from cas_service.setup._runner import run_steps
+    @pytest.fixture
+    def mock_q(self):
+        with patch("cas_service.setup._runner.questionary") as m:
+            yield m
+
+    @pytest.fixture
+    def confirm_ask(self, mock_q):
+        return mock_q.confirm.return_value.ask
 
+    @pytest.fixture
+    def select_ask(self, mock_q):
+        return mock_q.select.return_value.ask
+
+    def test_all_steps_already_configured(self, mock_q, console):
+        """run_steps returns True when all checks pass (no install needed)."""
         steps = [
-            self._make_step("Python", check=True),
-            self._make_step("Maxima", check=True),
+            _make_step("Python", check=True),
+            _make_step("Maxima", check=True),
         ]
-        result = run_steps(steps, _console())
+        result = run_steps(steps, console)
         assert result is True
         for s in steps:
             s.check.assert_called_once()
             s.install.assert_not_called()
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_step_install_and_verify(self, mock_q):
+    def test_step_install_and_verify(self, confirm_ask, console):
         """run_steps installs and verifies a step that fails check."""
-        from cas_service.setup._runner import run_steps
-
-        mock_q.confirm.return_value.ask.return_value = True
-        step = self._make_step("SymPy", check=False, install=True, verify=True)
-        result = run_steps([step], _console())
+        confirm_ask.return_value = True
+        step = _make_step("SymPy", check=False, install=True, verify=True)
+        result = run_steps([step], console)
         assert result is True
         step.install.assert_called_once()
         step.verify.assert_called_once()
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_user_skips_step(self, mock_q):
+    def test_user_skips_step(self, confirm_ask, console):
         """run_steps marks step as skipped when user declines."""
-        from cas_service.setup._runner import run_steps
-
-        mock_q.confirm.return_value.ask.return_value = False
-        step = self._make_step("MATLAB", check=False)
-        result = run_steps([step], _console())
+        confirm_ask.return_value = False
+        step = _make_step("MATLAB", check=False)
+        result = run_steps([step], console)
         assert result is True  # skipped != failed
         step.install.assert_not_called()
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_user_cancels_confirm_aborts(self, mock_q):
+    def test_user_cancels_confirm_aborts(self, confirm_ask, console):
         """run_steps returns False when user cancels the confirm prompt."""
-        from cas_service.setup._runner import run_steps
-
-        mock_q.confirm.return_value.ask.return_value = None
-        step = self._make_step("MATLAB", check=False)
-        result = run_steps([step], _console())
+        confirm_ask.return_value = None
+        step = _make_step("MATLAB", check=False)
+        result = run_steps([step], console)
         assert result is False
         step.install.assert_not_called()
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_install_fails_user_aborts(self, mock_q):
+    def test_install_fails_user_aborts(self, confirm_ask, select_ask, console):
         """run_steps returns False when install fails and user aborts."""
-        from cas_service.setup._runner import run_steps
-
-        mock_q.confirm.return_value.ask.return_value = True
-        mock_q.select.return_value.ask.return_value = "Abort"
-        step = self._make_step("Maxima", check=False, install=False)
-        result = run_steps([step], _console())
+        confirm_ask.return_value = True
+        select_ask.return_value = "Abort"
+        step = _make_step("Maxima", check=False, install=False)
+        result = run_steps([step], console)
         assert result is False
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_install_fails_user_skips(self, mock_q):
+    def test_install_fails_user_skips(self, confirm_ask, select_ask, console):
         """run_steps continues when install fails and user chooses skip."""
-        from cas_service.setup._runner import run_steps
-
-        mock_q.confirm.return_value.ask.return_value = True
-        mock_q.select.return_value.ask.return_value = "Skip and continue"
-        step = self._make_step("MATLAB", check=False, install=False)
-        result = run_steps([step], _console())
+        confirm_ask.return_value = True
+        select_ask.return_value = "Skip and continue"
+        step = _make_step("MATLAB", check=False, install=False)
+        result = run_steps([step], console)
         assert result is True  # skipped, not failed
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_install_fails_prompt_cancel_aborts(self, mock_q):
+    def test_install_fails_prompt_cancel_aborts(self, confirm_ask, select_ask, console):
         """run_steps returns False when retry/skip/abort prompt is cancelled."""
-        from cas_service.setup._runner import run_steps
-
-        mock_q.confirm.return_value.ask.return_value = True
-        mock_q.select.return_value.ask.return_value = None
-        step = self._make_step("MATLAB", check=False, install=False)
-        result = run_steps([step], _console())
+        confirm_ask.return_value = True
+        select_ask.return_value = None
+        step = _make_step("MATLAB", check=False, install=False)
+        result = run_steps([step], console)
         assert result is False
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_install_fails_retry_succeeds(self, mock_q):
+    def test_install_fails_retry_succeeds(self, confirm_ask, select_ask, console):
         """run_steps retries and succeeds on second attempt."""
-        from cas_service.setup._runner import run_steps
-
-        mock_q.confirm.return_value.ask.return_value = True
-        mock_q.select.return_value.ask.return_value = "Retry"
-        step = self._make_step("Maxima", check=False, verify=True)
+        confirm_ask.return_value = True
+        select_ask.return_value = "Retry"
+        step = _make_step("Maxima", check=False, verify=True)
         # First install fails, retry succeeds
-        step.install.side_effect = [False, True]
-        result = run_steps([step], _console())
+        step.install.side_effect = _PENDING_THEN_OK
+        result = run_steps([step], console)
         assert result is True
         assert step.install.call_count == 2
         step.verify.assert_called_once()
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_install_fails_retry_fails(self, mock_q):
+    def test_install_fails_retry_fails(self, confirm_ask, select_ask, console):
         """run_steps marks step as failed after retry also fails."""
-        from cas_service.setup._runner import run_steps
-
-        mock_q.confirm.return_value.ask.return_value = True
-        mock_q.select.return_value.ask.return_value = "Retry"
-        step = self._make_step("Maxima", check=False, install=False)
-        result = run_steps([step], _console())
+        confirm_ask.return_value = True
+        select_ask.return_value = "Retry"
+        step = _make_step("Maxima", check=False, install=False)
+        result = run_steps([step], console)
         assert result is False  # failed step
         assert step.install.call_count == 2
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_verify_fails_shows_warning(self, mock_q):
+    def test_verify_fails_shows_warning(self, confirm_ask, console):
         """run_steps shows warning when verify fails after install succeeds."""
-        from cas_service.setup._runner import run_steps
-
-        mock_q.confirm.return_value.ask.return_value = True
-        step = self._make_step("SymPy", check=False, install=True, verify=False)
-        result = run_steps([step], _console())
+        confirm_ask.return_value = True
+        step = _make_step("SymPy", check=False, install=True, verify=False)
+        result = run_steps([step], console)
         # "warn" is not "failed", so overall result is True
         assert result is True
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_mixed_steps(self, mock_q):
+    def test_mixed_steps(self, confirm_ask, console):
         """run_steps handles a mix of passing, installed, and skipped steps."""
-        from cas_service.setup._runner import run_steps
-
         # First step: already ok
-        step1 = self._make_step("Python", check=True)
+        step1 = _make_step("Python", check=True)
         # Second step: needs install, user confirms
-        step2 = self._make_step("SymPy", check=False, install=True, verify=True)
+        step2 = _make_step("SymPy", check=False, install=True, verify=True)
         # Third step: needs install, user skips
-        step3 = self._make_step("MATLAB", check=False)
+        step3 = _make_step("MATLAB", check=False)
 
         # confirm: True for step2, False for step3
-        mock_q.confirm.return_value.ask.side_effect = [True, False]
+        confirm_ask.side_effect = _TRUE_FALSE
 
-        result = run_steps([step1, step2, step3], _console())
+        result = run_steps([step1, step2, step3], console)
         assert result is True
         step1.install.assert_not_called()
         step2.install.assert_called_once()
         step3.install.assert_not_called()
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_empty_steps_list(self, mock_q):
-        """run_steps returns True for empty steps list."""
-        from cas_service.setup._runner import run_steps
+    def test_rechecks_after_step_needing_install(self, confirm_ask, console):
+        """run_steps re-runs later checks live once an earlier step was installed."""
+        confirm_ask.return_value = True
+        step1 = _make_step("Python", check=False)
+        step2 = _make_step("SymPy")
+        # Pre-probe: pending. Live re-check after step1 installed: ok.
+        step2.check.side_effect = _PENDING_THEN_OK
+
+        result = run_steps([step1, step2], console)
 
-        result = run_steps([], _console())
         assert result is True
+        step1.install.assert_called_once()
+        step2.install.assert_not_called()
+        assert step2.check.call_count == 2
 
-    @patch("cas_service.setup._runner.questionary")
-    def test_interactive_menu_exit_all_ok(self, mock_q):
-        """run_interactive_menu returns True when user exits and all steps are OK."""
-        from cas_service.setup._runner import run_interactive_menu
+    def test_probe_checks_prefers_native_acheck(self):
+        """_probe_checks awaits acheck() when a step defines it natively."""
+
+        class _AsyncStep:
+            name = "Async"
+
+            def check(self) -> bool:
+                raise AssertionError("sync check() should not be called")
+
+            async def acheck(self) -> bool:
+                return True
+
+        failing = _make_step("Broken")
+        failing.check.side_effect = RuntimeError("boom")
+
+        assert _probe_checks([_AsyncStep(), failing]) == [True, None]
+
+    def test_empty_steps_list(self, mock_q, console):
+        """run_steps returns True for empty steps list."""
+        result = run_steps([], console)
+        assert result is True
 
-        mock_q.select.return_value.ask.return_value = "exit"
+    def test_interactive_menu_exit_all_ok(self, select_ask, console):
+        """run_interactive_menu returns True when user exits and all steps are OK."""
+        select_ask.return_value = "exit"
         steps = [
-            self._make_step("Python", check=True),
-            self._make_step("SymPy", check=True),
+            _make_step("Python", check=True),
+            _make_step("SymPy", check=True),
         ]
-        result = run_interactive_menu(steps, _console())
+        result = run_interactive_menu(steps, console)
         assert result is True
         for step in steps:
-            assert step.check.call_count == 1
+            step.check.assert_called_once()
 
     @patch("cas_service.setup._runner._run_single_step", return_value="ok")
-    @patch("cas_service.setup._runner.questionary")
-    def test_interactive_menu_run_all_pending(self, mock_q, mock_run_one):
+    def test_interactive_menu_run_all_pending(self, mock_run_one, select_ask, console):
         """run_interactive_menu runs only pending steps for 'Run all pending'."""
-        from cas_service.setup._runner import run_interactive_menu
+        select_ask.side_effect = ("run_all", "exit")
+        step_ok = _make_step("Python", check=True)
+        step_pending = _make_step("Sage")
+        step_pending.check.side_effect = (False, True, True)
 
-        mock_q.select.return_value.ask.side_effect = ["run_all", "exit"]
-        step_ok = self._make_step("Python", check=True)
-        step_pending = self._make_step("Sage")
-        step_pending.check.side_effect = [False, True, True]
-
-        result = run_interactive_menu([step_ok, step_pending], _console())
+        result = run_interactive_menu([step_ok, step_pending], console)
 
         assert result is True
-        mock_run_one.assert_called_once()
-        assert mock_run_one.call_args[0][0] is step_pending
+        mock_run_one.assert_called_once_with(step_pending, console)
 
     @patch("cas_service.setup._runner._run_single_step", return_value="skipped")
-    @patch("cas_service.setup._runner.questionary")
-    def test_interactive_menu_preserves_skipped_status(self, mock_q, mock_run_one):
+    def test_interactive_menu_preserves_skipped_status(
+        self, mock_run_one, select_ask, console
+    ):
         """Skipping an optional step in menu should not force exit code 1."""
-        from cas_service.setup._runner import run_interactive_menu
+        select_ask.side_effect = (0, "exit")
+        step = _make_step("MATLAB")
+        step.check.side_effect = _PENDING_FOREVER
 
-        mock_q.select.return_value.ask.side_effect = [0, "exit"]
-        step = self._make_step("MATLAB")
-        step.check.side_effect = [False, False, False]
-
-        result = run_interactive_menu([step], _console())
+        result = run_interactive_menu([step], console)
 
         assert result is True
         mock_run_one.assert_called_once()
 
     @patch("cas_service.setup._runner._run_single_step", return_value="ok")
-    @patch("cas_service.setup._runner.questionary")
     def test_interactive_menu_refreshes_only_invalidated_steps(
-        self, mock_q, mock_run_one
+        self, mock_run_one, select_ask, console
     ):
         """Menu uses cached statuses and refreshes after invalidation only."""
-        from cas_service.setup._runner import run_interactive_menu
-
-        mock_q.select.return_value.ask.side_effect = [0, "exit"]
-        step1 = self._make_step("Python")
-        step2 = self._make_step("SymPy")
+        select_ask.side_effect = (0, "exit")
+        step1 = _make_step("Python")
+        step2 = _make_step("SymPy")
         # Initial snapshot: both pending. After running step1, refresh from step1 onward: both ok.
-        step1.check.side_effect = [False, True]
-        step2.check.side_effect = [False, True]
+        step1.check.side_effect = _PENDING_THEN_OK
+        step2.check.side_effect = _PENDING_THEN_OK
 
-        result = run_interactive_menu([step1, step2], _console())
+        result = run_interactive_menu([step1, step2], console)
 
         assert result is True
         mock_run_one.assert_called_once()
@@ -1074,85 +1169,61 @@ class TestRunner:
 class TestMain:
     @patch("cas_service.setup.main.run_steps", return_value=True)
     @patch("cas_service.setup.main.run_interactive_menu", return_value=True)
-    @patch("cas_service.setup.main.Console")
-    def test_main_no_args_runs_all(
-        self, mock_console_cls, mock_run_menu, mock_run_steps
-    ):
+    def test_main_no_args_runs_all(self, mock_run_menu, mock_run_steps, console):
         """main() with no args runs interactive menu with all setup steps."""
-        from cas_service.setup.main import main
-
-        mock_console_cls.return_value = _console()
-        main(args=[])
+        main(args=[], console=console)
         mock_run_menu.assert_called_once()
         mock_run_steps.assert_not_called()
         steps = mock_run_menu.call_args[0][0]
         assert len(steps) == 7  # Python, SymPy, MATLAB, Sage, WA, Service, Verify
 
     @patch("cas_service.setup.main.run_steps", return_value=True)
-    @patch("cas_service.setup.main.Console")
-    def test_main_engines_subcommand(self, mock_console_cls, mock_run_steps):
+    def test_main_engines_subcommand(self, mock_run_steps, console):
         """main(args=['engines']) runs engine-only steps."""
-        from cas_service.setup.main import main
-
-        mock_console_cls.return_value = _console()
-        main(args=["engines"])
+        main(args=["engines"], console=console)
         mock_run_steps.assert_called_once()
         steps = mock_run_steps.call_args[0][0]
         assert len(steps) == 4  # SymPy, MATLAB, Sage, WA
 
     @patch("cas_service.setup.main.run_steps", return_value=True)
-    @patch("cas_service.setup.main.Console")
-    def test_main_verify_subcommand(self, mock_console_cls, mock_run_steps):
+    def test_main_verify_subcommand(self, mock_run_steps, console):
         """main(args=['verify']) runs verification step only."""
-        from cas_service.setup.main import main
-
-        mock_console_cls.return_value = _console()
-        main(args=["verify"])
+        main(args=["verify"], console=console)
         mock_run_steps.assert_called_once()
         steps = mock_run_steps.call_args[0][0]
         assert len(steps) == 1
 
     @patch("cas_service.setup.main.run_steps", return_value=True)
-    @patch("cas_service.setup.main.Console")
-    def test_main_service_subcommand(self, mock_console_cls, mock_run_steps):
+    def test_main_service_subcommand(self, mock_run_steps, console):
         """main(args=['service']) runs service step only."""
-        from cas_service.setup.main import main
-
-        mock_console_cls.return_value = _console()
-        main(args=["service"])
+        main(args=["service"], console=console)
         mock_run_steps.assert_called_once()
         steps = mock_run_steps.call_args[0][0]
         assert len(steps) == 1
 
-    @patch("cas_service.setup.main.Console")
-    def test_main_unknown_subcommand_exits(self, mock_console_cls):
-        """main() exits with code 1 for unknown subcommand."""
-        from cas_service.setup.main import main
-
-        mock_console_cls.return_value = _console()
-        with pytest.raises(SystemExit) as exc_info:
-            main(args=["bogus"])
-        assert exc_info.value.code == 1
+    def test_main_unknown_subcommand_exits(self, console):
+        """main() returns exit code 1 for unknown subcommand."""
+        assert main(args=["bogus"], console=console) == 1
 
-    @patch("cas_service.setup.main.Console")
-    def test_main_help_returns(self, mock_console_cls):
-        """main(args=['--help']) prints usage and returns (no exit)."""
-        from cas_service.setup.main import main
-
-        mock_console_cls.return_value = _console()
-        # Should not raise
-        main(args=["--help"])
+    def test_main_help_returns(self, console):
+        """main(args=['--help']) prints usage and returns 0."""
+        assert main(args=["--help"], console=console) == 0
 
     @patch("cas_service.setup.main.run_interactive_menu", return_value=False)
-    @patch("cas_service.setup.main.Console")
-    def test_main_failure_exits_1(self, mock_console_cls, mock_run_menu):
-        """main() exits with code 1 when interactive menu returns False."""
-        from cas_service.setup.main import main
-
-        mock_console_cls.return_value = _console()
-        with pytest.raises(SystemExit) as exc_info:
-            main(args=[])
-        assert exc_info.value.code == 1
+    def test_main_failure_exits_1(self, mock_run_menu, console):
+        """main() returns exit code 1 when interactive menu returns False."""
+        assert main(args=[], console=console) == 1
+
+    def test_import_does_not_load_engines(self):
+        """Importing the wizard stays cheap: no CAS engine or service modules."""
+        code = (
+            "import sys, cas_service.setup.main; "
+            "print([m for m in ('sympy', 'cas_service.main') if m in sys.modules])"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert out.stdout.strip() == "[]"
 
 
 # ===========================================================================
@@ -1160,17 +1231,18 @@ class TestMain:
 # ===========================================================================
 
 
+_SUMMARY_SAMPLE = (
+    ("Python", "ok"),
+    ("MATLAB", "skipped"),
+    ("Service", "failed"),
+    ("SymPy", "warn"),
+    ("Unknown", "custom"),
+)
+
+
 class TestPrintSummary:
-    def test_print_summary_all_statuses(self):
-        """_print_summary handles all status types without error."""
-        from cas_service.setup._runner import _print_summary
-
-        results = [
-            ("Python", "ok"),
-            ("MATLAB", "skipped"),
-            ("Service", "failed"),
-            ("SymPy", "warn"),
-            ("Unknown", "custom"),
-        ]
+    @pytest.mark.parametrize("n", [1, 100])
+    def test_print_summary_all_statuses(self, n, console):
+        """_print_summary handles all status types, including long step lists."""
         # Should not raise
-        _print_summary(results, _console())
+        _print_summary(list(_SUMMARY_SAMPLE) * n, console)
@@ -2,15 +2,31 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock
+import importlib.util
+from dataclasses import replace
 
+import pytest
 
 from cas_service.engines.base import Capability, ComputeRequest
-from cas_service.engines.sympy_engine import (
-    SympyEngine,
-    _validate_input,
-)
+from cas_service.engines.sympy_engine import SympyEngine, _validate_input
 from cas_service.runtime.executor import ExecResult
+from tests._fakes import FakeExecutor
+
+# One character over the validator's 500-character limit
+_LONG_INPUT = "x" * 501
+
+# Baseline request; tests derive variants with dataclasses.replace(), always
+# passing inputs= so no variant shares (and could mutate) the baseline's dict
+_REQ_EVAL = ComputeRequest(
+    engine="sympy",
+    task_type="template",
+    template="evaluate",
+    inputs={"expression": "2**100"},
+)
+
+_EXPECTED_TEMPLATES = frozenset(
+    {"evaluate", "simplify", "solve", "factor", "integrate", "differentiate"}
+)
 
 
 # ---------------------------------------------------------------------------
@@ -19,29 +35,27 @@ from cas_service.runtime.executor import ExecResult
 
 
 class TestSympyInputValidation:
-    def test_valid_expression(self):
-        assert _validate_input("x**2 + 1") is True
-
-    def test_empty_rejected(self):
-        assert _validate_input("") is False
-
-    def test_too_long_rejected(self):
-        assert _validate_input("x" * 501) is False
-
-    def test_import_blocked(self):
-        assert _validate_input("__import__('os')") is False
-
-    def test_exec_blocked(self):
-        assert _validate_input("exec('code')") is False
-
-    def test_os_blocked(self):
-        assert _validate_input("os.system('ls')") is False
-
-    def test_null_byte_rejected(self):
-        assert _validate_input("x\x00y") is False
-
-    def test_safe_math(self):
-        assert _validate_input("sin(x) + cos(y)") is True
+    @pytest.mark.parametrize(
+        ("expr", "expected"),
+        [
+            pytest.param("x**2 + 1", True, id="valid"),
+            pytest.param("", False, id="empty"),
+            pytest.param(_LONG_INPUT, False, id="too-long"),
+            pytest.param("__import__('os')", False, id="import"),
+            pytest.param("exec('code')", False, id="exec"),
+            pytest.param("os.system('ls')", False, id="os"),
+            pytest.param("x\x00y", False, id="null-byte"),
+            pytest.param("sin(x) + cos(y)", True, id="safe-math"),
+        ],
+    )
+    def test_validate(self, expr, expected):
+        assert _validate_input(expr) is expected
+
+    def test_cache_hit(self):
+        _validate_input("x**3 - 2*x")
+        hits = _validate_input.cache_info().hits
+        assert _validate_input("x**3 - 2*x") is True
+        assert _validate_input.cache_info().hits == hits + 1
 
 
 # ---------------------------------------------------------------------------
@@ -57,24 +71,19 @@ class TestSympyCapabilities:
 
     def test_available_templates(self):
         templates = SympyEngine.available_templates()
-        assert "evaluate" in templates
-        assert "simplify" in templates
-        assert "solve" in templates
-        assert "factor" in templates
-        assert "integrate" in templates
-        assert "differentiate" in templates
-        assert len(templates) == 6
+        assert set(templates) == _EXPECTED_TEMPLATES
+        # Callers get their own dict; mutating it must not leak into the engine
+        templates.clear()
+        assert set(SympyEngine.available_templates()) == _EXPECTED_TEMPLATES
 
     def test_is_available(self):
         engine = SympyEngine()
         assert engine.is_available() is True
 
-    def test_get_version(self):
-        engine = SympyEngine()
-        version = engine.get_version()
-        assert version != "not installed"
+    def test_get_version(self, sympy_version):
+        assert sympy_version != "not installed"
         # Should be a version string like "1.12"
-        assert "." in version
+        assert "." in sympy_version
 
 
 # ---------------------------------------------------------------------------
@@ -91,8 +100,7 @@ class TestSympyValidateMocked:
             stderr="",
             time_ms=100,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         result = engine.validate("x^2 + 1")
         assert result.success is True
@@ -107,8 +115,7 @@ class TestSympyValidateMocked:
             stderr="",
             time_ms=50,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         result = engine.validate("\\invalid{}")
         assert result.success is False
@@ -123,8 +130,7 @@ class TestSympyValidateMocked:
             time_ms=5000,
             timed_out=True,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         result = engine.validate("x^2")
         assert result.success is False
@@ -138,8 +144,7 @@ class TestSympyValidateMocked:
             stderr="crash",
             time_ms=100,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
+        engine._executor = FakeExecutor(mock_result)
 
         result = engine.validate("x^2")
         assert result.success is False
@@ -160,14 +165,10 @@ class TestSympyComputeMocked:
             stderr="",
             time_ms=200,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
-
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="simplify",
-            inputs={"expression": "x**2 + 2*x + 1"},
+        engine._executor = FakeExecutor(mock_result)
+
+        req = replace(
+            _REQ_EVAL, template="simplify", inputs={"expression": "x**2 + 2*x + 1"}
         )
         result = engine.compute(req)
         assert result.success is True
@@ -175,36 +176,21 @@ class TestSympyComputeMocked:
 
     def test_unknown_template(self):
         engine = SympyEngine()
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="nonexistent",
-            inputs={},
-        )
+        req = replace(_REQ_EVAL, template="nonexistent", inputs={})
         result = engine.compute(req)
         assert result.success is False
         assert result.error_code == "UNKNOWN_TEMPLATE"
 
     def test_missing_input(self):
         engine = SympyEngine()
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="evaluate",
-            inputs={},
-        )
+        req = replace(_REQ_EVAL, inputs={})
         result = engine.compute(req)
         assert result.success is False
         assert result.error_code == "MISSING_INPUT"
 
     def test_invalid_input_value(self):
         engine = SympyEngine()
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="evaluate",
-            inputs={"expression": "__import__('os').system('ls')"},
-        )
+        req = replace(_REQ_EVAL, inputs={"expression": "__import__('os').system('ls')"})
         result = engine.compute(req)
         assert result.success is False
         assert result.error_code == "INVALID_INPUT"
@@ -218,16 +204,9 @@ class TestSympyComputeMocked:
             time_ms=5000,
             timed_out=True,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
-
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="evaluate",
-            inputs={"expression": "2**100"},
-        )
-        result = engine.compute(req)
+        engine._executor = FakeExecutor(mock_result)
+
+        result = engine.compute(_REQ_EVAL)
         assert result.success is False
         assert result.error_code == "TIMEOUT"
 
@@ -239,15 +218,9 @@ class TestSympyComputeMocked:
             stderr="crash",
             time_ms=100,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
-
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="evaluate",
-            inputs={"expression": "x^2"},
-        )
+        engine._executor = FakeExecutor(mock_result)
+
+        req = replace(_REQ_EVAL, inputs={"expression": "x^2"})
         result = engine.compute(req)
         assert result.success is False
         assert result.error_code == "ENGINE_ERROR"
@@ -260,15 +233,9 @@ class TestSympyComputeMocked:
             stderr="",
             time_ms=100,
         )
-        engine._executor = MagicMock()
-        engine._executor.run.return_value = mock_result
-
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="evaluate",
-            inputs={"expression": "foo"},
-        )
+        engine._executor = FakeExecutor(mock_result)
+
+        req = replace(_REQ_EVAL, inputs={"expression": "foo"})
         result = engine.compute(req)
         assert result.success is False
         assert result.error_code == "ENGINE_ERROR"
@@ -279,24 +246,32 @@ class TestSympyComputeMocked:
 # ---------------------------------------------------------------------------
 
 
+_requires_sympy = pytest.mark.skipif(
+    importlib.util.find_spec("sympy") is None, reason="sympy not installed"
+)
+
+
 class TestSympyIntegrationValidate:
     """Integration tests using real SymPy subprocess."""
 
+    pytestmark = [pytest.mark.sympy_integration, _requires_sympy]
+
     def test_validate_simple(self):
+        # One-shot subprocess on purpose: covers the real SubprocessExecutor path
         engine = SympyEngine(timeout=30)
         result = engine.validate("x^2 + 1")
         assert result.success is True
         assert result.is_valid is True
         assert result.simplified is not None
 
-    def test_validate_trig_identity(self):
-        engine = SympyEngine(timeout=30)
+    def test_validate_trig_identity(self, sympy_engine_session):
+        engine = sympy_engine_session
         result = engine.validate("\\sin(x)")
         assert result.success is True
         assert result.is_valid is True
 
-    def test_validate_invalid_latex(self):
-        engine = SympyEngine(timeout=30)
+    def test_validate_invalid_latex(self, sympy_engine_session):
+        engine = sympy_engine_session
         # Use truly unparseable LaTeX — bare backslash sequences get stripped
         # so we need something that causes a real parse error
         result = engine.validate("\\begin{matrix} \\end{}")
@@ -304,85 +279,28 @@ class TestSympyIntegrationValidate:
         assert isinstance(result.success, bool)
 
 
-class TestSympyIntegrationCompute:
-    """Integration tests using real SymPy subprocess."""
-
-    def test_simplify(self):
-        engine = SympyEngine(timeout=30)
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="simplify",
-            inputs={"expression": "(x**2 - 1)/(x - 1)"},
-            timeout_s=30,
-        )
-        result = engine.compute(req)
-        assert result.success is True
-        assert "x + 1" in result.result["value"]
-
-    def test_solve(self):
-        engine = SympyEngine(timeout=30)
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="solve",
-            inputs={"equation": "x**2 - 4", "variable": "x"},
-            timeout_s=30,
-        )
-        result = engine.compute(req)
-        assert result.success is True
-        assert "2" in result.result["value"]
-        assert "-2" in result.result["value"]
+# template -> (inputs, substrings expected in the result value)
+_COMPUTE_CASES = {
+    "simplify": ({"expression": "(x**2 - 1)/(x - 1)"}, ("x + 1",)),
+    "solve": ({"equation": "x**2 - 4", "variable": "x"}, ("2", "-2")),
+    "factor": ({"expression": "x**2 - 1"}, ("(x - 1)", "(x + 1)")),
+    "differentiate": ({"expression": "x**3", "variable": "x"}, ("3*x**2",)),
+    "integrate": ({"expression": "2*x", "variable": "x"}, ("x**2",)),
+    "evaluate": ({"expression": "2**10"}, ("1024",)),
+}
 
-    def test_factor(self):
-        engine = SympyEngine(timeout=30)
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="factor",
-            inputs={"expression": "x**2 - 1"},
-            timeout_s=30,
-        )
-        result = engine.compute(req)
-        assert result.success is True
-        assert "(x - 1)" in result.result["value"]
-        assert "(x + 1)" in result.result["value"]
 
-    def test_differentiate(self):
-        engine = SympyEngine(timeout=30)
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="differentiate",
-            inputs={"expression": "x**3", "variable": "x"},
-            timeout_s=30,
-        )
-        result = engine.compute(req)
-        assert result.success is True
-        assert "3*x**2" in result.result["value"]
+class TestSympyIntegrationCompute:
+    """Integration tests using real SymPy via the warm session engine."""
 
-    def test_integrate(self):
-        engine = SympyEngine(timeout=30)
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="integrate",
-            inputs={"expression": "2*x", "variable": "x"},
-            timeout_s=30,
-        )
-        result = engine.compute(req)
-        assert result.success is True
-        assert "x**2" in result.result["value"]
+    pytestmark = [pytest.mark.sympy_integration, _requires_sympy]
 
-    def test_evaluate(self):
-        engine = SympyEngine(timeout=30)
-        req = ComputeRequest(
-            engine="sympy",
-            task_type="template",
-            template="evaluate",
-            inputs={"expression": "2**10"},
-            timeout_s=30,
+    @pytest.mark.parametrize("template", list(_COMPUTE_CASES))
+    def test_template(self, sympy_engine_session, template):
+        inputs, expected_values = _COMPUTE_CASES[template]
+        result = sympy_engine_session.compute(
+            replace(_REQ_EVAL, template=template, inputs=inputs, timeout_s=30)
         )
-        result = engine.compute(req)
         assert result.success is True
-        assert "1024" in result.result["value"]
+        for expected in expected_values:
+            assert expected in result.result["value"]
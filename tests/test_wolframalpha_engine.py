@@ -2,16 +2,73 @@
 
 from __future__ import annotations
 
+import http.client
 import json
 import urllib.error
 from http.server import HTTPServer
 from threading import Thread
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
 
+import cas_service.main as cas_main
 from cas_service.engines.base import Capability, ComputeRequest
 from cas_service.engines.wolframalpha_engine import WolframAlphaEngine
+from tests._fakes import FakeUrlResponse
+
+
+# WolframAlpha API answers by scenario, encoded once at import
+_SCENARIOS = {
+    "result_4": {
+        "queryresult": {
+            "success": True,
+            "pods": [
+                {"id": "Input", "subpods": [{"plaintext": "2 + 2"}]},
+                {"id": "Result", "subpods": [{"plaintext": "4"}]},
+            ],
+        },
+    },
+    "solve": {
+        "queryresult": {
+            "success": True,
+            "pods": [
+                {"id": "Input", "subpods": [{"plaintext": "solve x^2 = 4"}]},
+                {
+                    "id": "Solution",
+                    "subpods": [{"plaintext": "x = -2 or x = 2"}],
+                },
+            ],
+        },
+    },
+    "query_failed": {
+        "queryresult": {"success": False, "tips": {"text": "Check input"}},
+    },
+    "no_result_pod": {
+        "queryresult": {
+            "success": True,
+            "pods": [
+                {"id": "Input", "subpods": [{"plaintext": "hello"}]},
+            ],
+        },
+    },
+    "decimal_only": {
+        "queryresult": {
+            "success": True,
+            "pods": [
+                {"id": "Input", "subpods": [{"plaintext": "pi"}]},
+                {
+                    "id": "DecimalApproximation",
+                    "subpods": [
+                        {"plaintext": "3.14159265358979..."},
+                    ],
+                },
+            ],
+        },
+    },
+}
+_PAYLOADS = {k: json.dumps(v).encode() for k, v in _SCENARIOS.items()}
+
+_EXPECTED_TEMPLATES = frozenset({"evaluate", "simplify", "solve"})
 
 
 # ---------------------------------------------------------------------------
@@ -37,9 +94,9 @@ class TestWACapabilities:
 
     def test_available_templates(self):
         templates = WolframAlphaEngine.available_templates()
-        assert "evaluate" in templates
-        assert "solve" in templates
-        assert "simplify" in templates
+        assert set(templates) == _EXPECTED_TEMPLATES
+        templates.clear()
+        assert set(WolframAlphaEngine.available_templates()) == _EXPECTED_TEMPLATES
 
 
 class TestWAAvailability:
@@ -99,28 +156,19 @@ class TestWATemplateErrors:
         assert result.error_code == "MISSING_INPUT"
 
 
+@pytest.fixture()
+def mock_urlopen(monkeypatch):
+    """Replace urlopen() for the WolframAlpha engine; tests set its answer."""
+    mock = MagicMock()
+    monkeypatch.setattr(
+        "cas_service.engines.wolframalpha_engine.urllib.request.urlopen", mock
+    )
+    return mock
+
+
 class TestWAAPICall:
-    def _mock_response(self, data: dict):
-        """Create a mock urllib response."""
-        mock = MagicMock()
-        mock.read.return_value = json.dumps(data).encode()
-        mock.__enter__ = MagicMock(return_value=mock)
-        mock.__exit__ = MagicMock(return_value=False)
-        return mock
-
-    @patch("cas_service.engines.wolframalpha_engine.urllib.request.urlopen")
     def test_successful_evaluate(self, mock_urlopen):
-        mock_urlopen.return_value = self._mock_response(
-            {
-                "queryresult": {
-                    "success": True,
-                    "pods": [
-                        {"id": "Input", "subpods": [{"plaintext": "2 + 2"}]},
-                        {"id": "Result", "subpods": [{"plaintext": "4"}]},
-                    ],
-                },
-            }
-        )
+        mock_urlopen.return_value = FakeUrlResponse(_PAYLOADS["result_4"])
         engine = WolframAlphaEngine(app_id="FAKE")
         req = ComputeRequest(
             engine="wolframalpha",
@@ -133,22 +181,8 @@ class TestWAAPICall:
         assert result.result == {"value": "4"}
         assert result.stdout == "4"
 
-    @patch("cas_service.engines.wolframalpha_engine.urllib.request.urlopen")
     def test_solve_template(self, mock_urlopen):
-        mock_urlopen.return_value = self._mock_response(
-            {
-                "queryresult": {
-                    "success": True,
-                    "pods": [
-                        {"id": "Input", "subpods": [{"plaintext": "solve x^2 = 4"}]},
-                        {
-                            "id": "Solution",
-                            "subpods": [{"plaintext": "x = -2 or x = 2"}],
-                        },
-                    ],
-                },
-            }
-        )
+        mock_urlopen.return_value = FakeUrlResponse(_PAYLOADS["solve"])
         engine = WolframAlphaEngine(app_id="FAKE")
         req = ComputeRequest(
             engine="wolframalpha",
@@ -160,13 +194,8 @@ class TestWAAPICall:
         assert result.success is True
         assert "x = " in result.result["value"]
 
-    @patch("cas_service.engines.wolframalpha_engine.urllib.request.urlopen")
     def test_query_failed(self, mock_urlopen):
-        mock_urlopen.return_value = self._mock_response(
-            {
-                "queryresult": {"success": False, "tips": {"text": "Check input"}},
-            }
-        )
+        mock_urlopen.return_value = FakeUrlResponse(_PAYLOADS["query_failed"])
         engine = WolframAlphaEngine(app_id="FAKE")
         req = ComputeRequest(
             engine="wolframalpha",
@@ -178,18 +207,8 @@ class TestWAAPICall:
         assert result.success is False
         assert result.error_code == "QUERY_FAILED"
 
-    @patch("cas_service.engines.wolframalpha_engine.urllib.request.urlopen")
     def test_no_result_pod(self, mock_urlopen):
-        mock_urlopen.return_value = self._mock_response(
-            {
-                "queryresult": {
-                    "success": True,
-                    "pods": [
-                        {"id": "Input", "subpods": [{"plaintext": "hello"}]},
-                    ],
-                },
-            }
-        )
+        mock_urlopen.return_value = FakeUrlResponse(_PAYLOADS["no_result_pod"])
         engine = WolframAlphaEngine(app_id="FAKE")
         req = ComputeRequest(
             engine="wolframalpha",
@@ -201,7 +220,6 @@ class TestWAAPICall:
         assert result.success is False
         assert result.error_code == "NO_RESULT"
 
-    @patch("cas_service.engines.wolframalpha_engine.urllib.request.urlopen")
     def test_http_403_auth_error(self, mock_urlopen):
         mock_urlopen.side_effect = urllib.error.HTTPError(
             url="",
@@ -221,7 +239,6 @@ class TestWAAPICall:
         assert result.success is False
         assert result.error_code == "AUTH_ERROR"
 
-    @patch("cas_service.engines.wolframalpha_engine.urllib.request.urlopen")
     def test_network_error(self, mock_urlopen):
         mock_urlopen.side_effect = urllib.error.URLError("Connection refused")
         engine = WolframAlphaEngine(app_id="FAKE")
@@ -235,7 +252,6 @@ class TestWAAPICall:
         assert result.success is False
         assert result.error_code == "NETWORK_ERROR"
 
-    @patch("cas_service.engines.wolframalpha_engine.urllib.request.urlopen")
     def test_timeout(self, mock_urlopen):
         mock_urlopen.side_effect = TimeoutError("timed out")
         engine = WolframAlphaEngine(app_id="FAKE")
@@ -250,25 +266,9 @@ class TestWAAPICall:
         assert result.success is False
         assert result.error_code == "TIMEOUT"
 
-    @patch("cas_service.engines.wolframalpha_engine.urllib.request.urlopen")
     def test_fallback_to_non_input_pod(self, mock_urlopen):
         """When no Result/Solution pod, use first non-Input pod."""
-        mock_urlopen.return_value = self._mock_response(
-            {
-                "queryresult": {
-                    "success": True,
-                    "pods": [
-                        {"id": "Input", "subpods": [{"plaintext": "pi"}]},
-                        {
-                            "id": "DecimalApproximation",
-                            "subpods": [
-                                {"plaintext": "3.14159265358979..."},
-                            ],
-                        },
-                    ],
-                },
-            }
-        )
+        mock_urlopen.return_value = FakeUrlResponse(_PAYLOADS["decimal_only"])
         engine = WolframAlphaEngine(app_id="FAKE")
         req = ComputeRequest(
             engine="wolframalpha",
@@ -280,23 +280,12 @@ class TestWAAPICall:
         assert result.success is True
         assert "3.14159" in result.result["value"]
 
-    @patch("cas_service.engines.wolframalpha_engine.urllib.request.urlopen")
     def test_uses_api_url_override_from_env(self, mock_urlopen, monkeypatch):
         monkeypatch.setenv(
             "CAS_WOLFRAMALPHA_API_URL",
             "http://wa-proxy.local/v2/query",
         )
-        mock_urlopen.return_value = self._mock_response(
-            {
-                "queryresult": {
-                    "success": True,
-                    "pods": [
-                        {"id": "Input", "subpods": [{"plaintext": "2 + 2"}]},
-                        {"id": "Result", "subpods": [{"plaintext": "4"}]},
-                    ],
-                },
-            }
-        )
+        mock_urlopen.return_value = FakeUrlResponse(_PAYLOADS["result_4"])
         engine = WolframAlphaEngine(app_id="FAKE")
         req = ComputeRequest(
             engine="wolframalpha",
@@ -315,84 +304,82 @@ class TestWAAPICall:
 # ---------------------------------------------------------------------------
 
 
-@pytest.fixture()
-def cas_server_with_wa():
-    """Start CAS server with WolframAlpha engine (no real API key)."""
-    import cas_service.main as cas_main
-
-    original_engines = cas_main.ENGINES.copy()
-    cas_main.ENGINES.clear()
-
-    # One with key, one without
-    wa_with_key = WolframAlphaEngine(app_id="FAKE-KEY")
-    cas_main.ENGINES["wolframalpha"] = wa_with_key
-
+@pytest.fixture(scope="module")
+def cas_server():
+    """One CAS HTTP server per module; tests swap ENGINES underneath it."""
     server = HTTPServer(("127.0.0.1", 0), cas_main.CASHandler)
-    port = server.server_address[1]
     thread = Thread(target=server.serve_forever, daemon=True)
     thread.start()
 
-    yield ("127.0.0.1", port)
+    yield server.server_address
 
     server.shutdown()
-    cas_main.ENGINES.clear()
-    cas_main.ENGINES.update(original_engines)
+    server.server_close()
 
 
-@pytest.fixture()
-def cas_server_wa_unavailable(monkeypatch):
-    """Start CAS server with WolframAlpha engine without API key."""
-    import cas_service.main as cas_main
+@pytest.fixture(scope="module")
+def cas_conn(cas_server):
+    """Connection to the module's server, shared by every test.
 
-    original_engines = cas_main.ENGINES.copy()
-    cas_main.ENGINES.clear()
+    The handler speaks HTTP/1.0 and closes after each response; the
+    connection reopens its socket on the next request.
+    """
+    conn = http.client.HTTPConnection(*cas_server, timeout=5)
+    yield conn
+    conn.close()
 
-    monkeypatch.setenv("CAS_WOLFRAMALPHA_APPID", "ENV-SET")
-    wa_no_key = WolframAlphaEngine(app_id="")
-    cas_main.ENGINES["wolframalpha"] = wa_no_key
 
-    server = HTTPServer(("127.0.0.1", 0), cas_main.CASHandler)
-    port = server.server_address[1]
-    thread = Thread(target=server.serve_forever, daemon=True)
-    thread.start()
+@pytest.fixture()
+def cas_engines():
+    """Give the test an empty ENGINES registry; restore the original after."""
+    original_engines = cas_main.ENGINES.copy()
+    cas_main.ENGINES.clear()
 
-    yield ("127.0.0.1", port)
+    yield cas_main.ENGINES
 
-    server.shutdown()
     cas_main.ENGINES.clear()
     cas_main.ENGINES.update(original_engines)
 
 
-def _get(addr, path):
-    import http.client
+@pytest.fixture()
+def cas_server_with_wa(cas_conn, cas_engines):
+    """CAS server with WolframAlpha engine (no real API key)."""
+    cas_engines["wolframalpha"] = WolframAlphaEngine(app_id="FAKE-KEY")
+    return cas_conn
+
+
+@pytest.fixture()
+def cas_server_wa_unavailable(cas_conn, cas_engines, monkeypatch):
+    """CAS server with WolframAlpha engine without API key."""
+    monkeypatch.setenv("CAS_WOLFRAMALPHA_APPID", "ENV-SET")
+    cas_engines["wolframalpha"] = WolframAlphaEngine(app_id="")
+    return cas_conn
+
 
-    conn = http.client.HTTPConnection(addr[0], addr[1], timeout=5)
-    conn.request("GET", path)
+def _request(conn, method, path, body=None, headers=None):
+    """Send one request on the shared connection; return (status, JSON body)."""
+    conn.request(method, path, body=body, headers=headers or {})
     resp = conn.getresponse()
-    data = json.loads(resp.read())
-    status = resp.status
-    conn.close()
-    return status, data
+    return resp.status, json.loads(resp.read())
+
 
+def _get(conn, path):
+    return _request(conn, "GET", path)
 
-def _post(addr, path, body):
-    import http.client
 
-    conn = http.client.HTTPConnection(addr[0], addr[1], timeout=5)
-    conn.request(
+def _post(conn, path, body):
+    return _request(
+        conn,
         "POST",
         path,
         body=json.dumps(body),
         headers={"Content-Type": "application/json"},
     )
-    resp = conn.getresponse()
-    data = json.loads(resp.read())
-    status = resp.status
-    conn.close()
-    return status, data
 
 
 class TestWAHTTPIntegration:
+    pytestmark = pytest.mark.wa_http
+
     def test_engines_shows_wa_available(self, cas_server_with_wa):
         status, data = _get(cas_server_with_wa, "/engines")
         assert status == 200
@@ -423,23 +410,8 @@ class TestWAHTTPIntegration:
         assert status == 503
         assert data["code"] == "ENGINE_UNAVAILABLE"
 
-    @patch("cas_service.engines.wolframalpha_engine.urllib.request.urlopen")
-    def test_compute_wa_via_http(self, mock_urlopen, cas_server_with_wa):
-        mock_resp = MagicMock()
-        mock_resp.read.return_value = json.dumps(
-            {
-                "queryresult": {
-                    "success": True,
-                    "pods": [
-                        {"id": "Input", "subpods": [{"plaintext": "2 + 2"}]},
-                        {"id": "Result", "subpods": [{"plaintext": "4"}]},
-                    ],
-                },
-            }
-        ).encode()
-        mock_resp.__enter__ = MagicMock(return_value=mock_resp)
-        mock_resp.__exit__ = MagicMock(return_value=False)
-        mock_urlopen.return_value = mock_resp
+    def test_compute_wa_via_http(self, cas_server_with_wa, mock_urlopen):
+        mock_urlopen.return_value = FakeUrlResponse(_PAYLOADS["result_4"])
 
         status, data = _post(
             cas_server_with_wa,